@@ -1,24 +1,23 @@
 """
 The Dash application / UI for the game
 
-TODO: bug - game does not correctly check if any piece can take the piece that is checking the king.
-
 author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-22
 """
-from dash import Dash, Input, Output, ctx, State, ALL
+from dash import Dash, Input, Output, ctx, State, ALL, Patch, ClientsideFunction, no_update
 from dash.dcc import Interval, Store
 from dash.exceptions import PreventUpdate
 from dash.html import Div, Button
-from dash_svg import Svg
 from flask import Flask
 from itertools import product
-from parsers.svg import SVGParser
-from pathlib import Path
+from os import environ
 from random import randint
+from src.board import Board
 from src.game import Game
+from src.game_store import GameStore, game_store
 from src.piece import Queen, Rook, Knight, Bishop, PIECE_TYPE_MAPPER, PieceOption, PieceType
-from src.state import State as GameState
+from src.record import RecordWriter
+from src.state import DRAWS, GAME_OVER, State as GameState
 from src.tile import Tile
 from typing import Optional
 from ui.clock import Clock
@@ -27,6 +26,10 @@ from utils.color import Color, opponent
 from utils.letters import LETTERS
 from utils.time import time_int_to_str
 
+# the original class of each tile, by square, which only depends on the geometry of the board. It is shared by all
+# sessions, so it is immutable; the state of the tiles of a session lives in its tile store
+TILE_CLASSES: tuple[str, ...] = tuple(f'tile {tile.color}' for tile in Board().flat)
+
 
 class App(Dash):
     def __init__(self, *args, **kwargs):
@@ -37,8 +40,9 @@ class App(Dash):
             **kwargs
         )
 
-        self.games: dict[str: Game] = {}
-        self.original_classes = []
+        self.games: GameStore = game_store()
+        # finished games are appended to a record file, if GAME_ARCHIVE_PATH is set
+        self.archive = RecordWriter(path) if (path := environ.get('GAME_ARCHIVE_PATH')) else None
         self.assets = self.load_assets()
 
         # last step in the constructor is to set up the dash app
@@ -59,11 +63,16 @@ class App(Dash):
                 Store(id='selected_tile_store'),  # stores the currently selected tile
                 Store(id='help_store'),  # stores whether the help function is activated
                 Store(id='timer_store'),  # stores whether the timer is activated
-                Store(id='tile_store'),  # stores the current state of the tiles
+                Store(id='tile_store'),  # stores the current state of the tiles, i.e. their class and piece
                 Div(id='menu', children=self.init_menu_items()),
                 Div(id='indicator', children=Div(id='signal', className='signal')),
                 Div(id='clocks', className='clocks', children=[
-                    Interval(id='ticker', disabled=True), Div(id='black-clock'), Div(id='white-clock')
+                    Interval(id='ticker', disabled=True),
+                    Store(id='clock_store'),  # stores the remaining time of the players, as sent by the server
+                    Store(id='clock_anchor_store'),  # stores the remaining time and when it was received
+                    Store(id='timeout_store'),  # stores the color of the player that ran out of time
+                    Div(id='black-clock'),
+                    Div(id='white-clock')
                 ]),
                 Div(id='promotion'),
                 Div(id='border', children=self.init_labels()),
@@ -71,9 +80,22 @@ class App(Dash):
             ]
         )
 
-    def game(self, game_id: str) -> Game:
+    def game(self, game_id: str) -> Optional[Game]:
+        """ return a game from the game store, or None if it is no longer there, e.g. when it was evicted after being
+        idle. Games may be stored elsewhere, so the game returned must be put back in the store once it is changed """
         return self.games.get(game_id)
 
+    def restart(self, game_id: str, clock: bool = False) -> Game:
+        """ start a new game under the id of a game that is no longer in the store, optionally with the clock running.
+        The browser still shows the old game, so its board must be reset to the new one """
+        game = Game()
+        if clock:
+            game.start_clock()
+        self.games.put(game_id, game)
+        print(f'{game_id}: game expired, starting new game (active games: {len(self.games)})')
+
+        return game
+
     @staticmethod
     def init_menu_items() -> list[Button]:
         """ create the menu items """
@@ -83,41 +105,46 @@ class App(Dash):
             Button(id='timer', className='timer menu-item', children=TimerIcon())
         ]
 
-    def init_clocks(self, game_id: str) -> Optional[list[Div]]:
-        """ create the time clocks """
+    def init_clocks(self, game: Game) -> Optional[list[Div]]:
+        """ create the time clocks. The clocks count down in the browser, the ticker doesn't reach the server """
         return [
-            Interval(id='ticker', interval=1_000, disabled=True),
-            Clock(id='black-clock', className='clock', time=time_int_to_str(self.games.get(game_id).time)),
-            Clock(id='white-clock', className='clock', time=time_int_to_str(self.game(game_id).time)),
+            Interval(id='ticker', interval=250, disabled=not game.clock_running),
+            Store(id='clock_store', data=self.clock(game)),
+            Store(id='clock_anchor_store'),
+            Store(id='timeout_store'),
+            Clock(id='black-clock', className='clock', time=time_int_to_str(game.time)),
+            Clock(id='white-clock', className='clock', time=time_int_to_str(game.time)),
         ]
 
-    def init_board(self, game_id: str) -> list[Button]:
-        """ initiate the game board. update the original classes of each tile"""
-        buttons = []
-        self.original_classes = []
-        for row in self.game(game_id).board.tiles:
-            for tile in row:
-                class_name = f'tile {tile.color}'
-                self.original_classes.append(class_name)
-                buttons.append(
-                    Button(
-                        id={
-                            'type': 'tile',
-                            'index': tile.name
-                        },
-                        className=class_name,
-                        children=self.get_piece_asset(tile.piece)
-                    )
-                )
-
-        return buttons
+    @staticmethod
+    def clock(game: Game) -> dict:
+        """ return the state of the clock, which the browser counts down from: the remaining time of both players,
+        whose turn it is and whether the clock is running """
+        return {
+            'remaining': {c.value: game.remaining_time(c) for c in Color.members()},
+            'turn': game.turn.value,
+            'running': game.clock_running
+        }
+
+    def init_board(self, game: Game) -> list[Button]:
+        """ initiate the game board """
+        return [
+            Button(
+                id={
+                    'type': 'tile',
+                    'index': tile.name
+                },
+                className=TILE_CLASSES[square],
+                children=self.get_piece_asset(tile.piece)
+            ) for square, tile in enumerate(game.board.flat)
+        ]
 
-    def init_promotion_tile(self, game_id: str, tile: Tile) -> Div:
+    def init_promotion_tile(self, game: Game, tile: Tile) -> Div:
         """ create a promotion tile, where a player can select which piece to promote a pawn to"""
         return Div(
             className='promotion-tile',
             style={
-                'grid-row': f'{self.game(game_id).board.height - tile.y + 1} / span 1',
+                'grid-row': f'{game.board.height - tile.y + 1} / span 1',
                 'grid-column': f'{tile.x_int + 1} / span 1',
                 'background': 'var(--white-tile)' if tile.color == '⬜' else 'var(--black-tile)'
             },
@@ -126,19 +153,19 @@ class App(Dash):
                 # makes it the opponents turn
                 Button(
                     id={'type': 'promotion', 'index': 'queen'},
-                    children=self.get_piece_asset(Queen(opponent(self.game(game_id).turn)))
+                    children=self.get_piece_asset(Queen(opponent(game.turn)))
                 ),
                 Button(
                     id={'type': 'promotion', 'index': 'bishop'},
-                    children=self.get_piece_asset(Bishop(opponent(self.game(game_id).turn)))
+                    children=self.get_piece_asset(Bishop(opponent(game.turn)))
                 ),
                 Button(
                     id={'type': 'promotion', 'index': 'knight'},
-                    children=self.get_piece_asset(Knight(opponent(self.game(game_id).turn)))
+                    children=self.get_piece_asset(Knight(opponent(game.turn)))
                 ),
                 Button(
                     id={'type': 'promotion', 'index': 'rook'},
-                    children=self.get_piece_asset(Rook(opponent(self.game(game_id).turn)))
+                    children=self.get_piece_asset(Rook(opponent(game.turn)))
                 ),
             ]
         )
@@ -153,93 +180,83 @@ class App(Dash):
         return [top_letters, lft_numbers, rgt_numbers, btm_letters]
 
     @staticmethod
-    def load_assets() -> dict[str: Svg]:
-        """ load all the piece assets """
-        svgs = {}
+    def load_assets() -> dict[str: Div]:
+        """ load all the piece assets. A piece is an empty element with a class per piece type and color, which the
+        stylesheet draws using the svg in assets/pieces as a mask. The browser fetches and caches each svg once,
+        instead of every tile carrying the paths of its piece """
+        pieces = {}
         for piece_type, color in product(PieceOption, Color.members()):
             symbol = str(PIECE_TYPE_MAPPER.get(piece_type.value)(color))
+            pieces |= {symbol: Div(className=f'piece piece-{color.value}-{piece_type.value}')}
 
-            svgs |= {
-                symbol: SVGParser
-                .from_file(
-                    file=Path('assets', 'pieces', color.value, f'{piece_type.value}.svg'),
-                    fill='#264653',
-                    stroke_width=0
-                )
-                .parse_svg(
-                    with_color=False,
-                    classes=['piece']
-                )
-            }
-
-        return svgs
-
-    def reset_effects(self, tiles: list[dict]) -> list[dict]:
-        """ reset the class for each tile to its original state"""
-        # reset fx
-        for i, _ in enumerate(tiles):
-            tiles[i]['props']['className'] = self.original_classes[i]
+        return pieces
 
-        return tiles
-
-    def update_effects(self, game_id: str, tiles: list[dict], index: str, *, add: list[str]) -> list[dict]:
-        """ update the class at tile 'index', add each element in 'add' not already in its class list"""
-        for a in add:
-            current_classes = tiles[self.game(game_id).board.index_by_name(index)]['props']['className']
-            if a not in current_classes:
-                tiles[self.game(game_id).board.index_by_name(index)]['props']['className'] = current_classes + ' ' + a
-
-        return tiles
+    @staticmethod
+    def effects(game: Game, selected_tile_name: Optional[str], is_help_activated: bool) -> dict[str, list]:
+        """ return the effects to add to the class of each tile, by tile name, given the selected tile """
+        if selected_tile_name is None:
+            return {}
+
+        effects = {selected_tile_name: ['selected']}
+        if is_help_activated:
+            selected_tile = game.board.tile_by_name(selected_tile_name)
+
+            # id the valid moves
+            for t in game.valid_moves(selected_tile):
+                effects.setdefault(t.name, []).append('valid-move')
+
+            threatened_tiles = {t.name for t in game.is_under_thread_by(selected_tile)}
+            threatening_tiles = {t.name for t in game.is_threatening(selected_tile)}
+
+            for t in threatened_tiles | threatening_tiles:
+                if t in threatened_tiles and t in threatening_tiles:
+                    effects.setdefault(t, []).append('thrthr')
+                elif t in threatened_tiles:
+                    effects.setdefault(t, []).append('threatened')
+                else:
+                    effects.setdefault(t, []).append('threatening')
 
-    def update_placement(self, game_id: str, tiles: list[dict]) -> list[dict]:
-        """ update the children of all tiles with the current game state"""
-        for i, _ in enumerate(tiles):
-            tiles[i]['props']['children'] = self.get_piece_asset(self.game(game_id).board.tile_by_index(i).piece)
+        return effects
 
-        return tiles
+    def tile_state(self, game: Game, selected_tile_name: Optional[str], is_help_activated: bool) -> list[list]:
+        """ return the render state of each tile: its class, i.e. the original class plus the effects, and the symbol
+        of the piece on it """
+        effects = self.effects(game, selected_tile_name, is_help_activated)
+        return [
+            [' '.join([TILE_CLASSES[square], *effects.get(tile.name, [])]), str(tile.piece)]
+            for square, tile in enumerate(game.board.flat)
+        ]
 
     def update_tiles(
-            self, game_id: str, tiles: list[dict], selected_tile_name: str, is_help_activated: bool
-    ) -> list[dict]:
-        """ update the tiles, update the placements and effects"""
-        tiles = self.update_placement(game_id, tiles)
-        tiles = self.reset_effects(tiles)
-
-        # if there is a tile selected
-        if selected_tile_name is not None:
-            tiles = self.update_effects(game_id, tiles, selected_tile_name, add=['selected'])
-            if is_help_activated:
-                # id the valid moves
-                for t in self.game(game_id).valid_moves(self.game(game_id).board.tile_by_name(selected_tile_name)):
-                    tiles = self.update_effects(game_id, tiles, t.name, add=['valid-move'])
-
-                threatened_tiles = [
-                    t.name for t in self.game(game_id).is_under_thread_by(
-                        self.game(game_id).board.tile_by_name(selected_tile_name)
-                    )
-                ]
-
-                threatening_tiles = [
-                    t.name for t in self.game(game_id).is_threatening(
-                        self.game(game_id).board.tile_by_name(selected_tile_name)
-                    )
-                ]
+            self, game: Game, previous_state: Optional[list[list]], selected_tile_name: str, is_help_activated: bool
+    ) -> tuple[Patch, Patch]:
+        """ update the tiles, update the placements and effects. Compares the new state of the tiles to the previous
+        state, as kept in the tile store, and returns a patch of the chessboard and one of the tile store, which only
+        touch the tiles that changed """
+        state = self.tile_state(game, selected_tile_name, is_help_activated)
+        if previous_state is None:
+            previous_state = [[None, None]] * len(state)
+
+        tiles, store = Patch(), Patch()
+        for i, (previous, current) in enumerate(zip(previous_state, state)):
+            if previous == current:
+                continue
+
+            class_name, symbol = current
+            if previous[0] != class_name:
+                tiles[i]['props']['className'] = class_name
+            if previous[1] != symbol:
+                tiles[i]['props']['children'] = self.assets.get(symbol)
+            store[i] = current
+
+        return tiles, store
 
-                for t in set(threatened_tiles + threatening_tiles):
-                    if t in threatened_tiles and t in threatening_tiles:
-                        tiles = self.update_effects(game_id, tiles, t, add=['thrthr'])
-                    elif t in threatened_tiles:
-                        tiles = self.update_effects(game_id, tiles, t, add=['threatened'])
-                    else:
-                        tiles = self.update_effects(game_id, tiles, t, add=['threatening'])
-
-        return tiles
-
-    def update_selection(self, game_id: str, triggered_tile_name: str, selected_tile_name: str | None) -> str:
+    @staticmethod
+    def update_selection(game: Game, triggered_tile_name: str, selected_tile_name: str | None) -> str:
         """ update the selection state depending on which index was triggered. """
         # if nothing was selected and the player clicked on a piece of its own color, select it
         if selected_tile_name is None \
-                and self.game(game_id).board.tile_by_name(triggered_tile_name).piece.color == self.game(game_id).turn:
+                and game.board.tile_by_name(triggered_tile_name).piece.color == game.turn:
             selected_tile_name = triggered_tile_name
         # if the click was on the currently already selected tile, deselect it
         elif triggered_tile_name == selected_tile_name:
@@ -251,46 +268,74 @@ class App(Dash):
 
         return selected_tile_name
 
-    def log(self, game_id: str, state: Optional[GameState], selected_tile_name: str):
+    @staticmethod
+    def log(game_id: str, game: Game, state: Optional[GameState], selected_tile_name: str):
         if selected_tile_name is not None:
-            print(f"{game_id}: its {self.game(game_id).turn.name}'s turn, "
-                  f"{self.game(game_id).board.tile_by_name(selected_tile_name).piece.__class__.__name__} at "
+            print(f"{game_id}: its {game.turn.name}'s turn, "
+                  f"{game.board.tile_by_name(selected_tile_name).piece.__class__.__name__} at "
                   f"{selected_tile_name} is selected")
         else:
-            print(f"{game_id}: its {self.game(game_id).turn.name}'s turn, nothing is selected")
+            print(f"{game_id}: its {game.turn.name}'s turn, nothing is selected")
 
         if state is not None:
-            print(f'{game_id}: player {self.game(game_id).turn.name}: {state.name}')
+            print(f'{game_id}: player {game.turn.name}: {state.name}')
 
-    def get_piece_asset(self, piece: PieceType) -> Svg | None:
-        """ loads the piece asset on <tile> and return as svg """
+    @staticmethod
+    def game_over(game: Game) -> bool:
+        """ whether the game is over. It isn't while the piece a pawn is promoted to is yet to be picked, as the queen
+        it is provisionally promoted to may end the game where the piece picked doesn't """
+        if game.which_pawn_promotable() is not None:
+            return False
+
+        return game.state() in GAME_OVER
+
+    def end_game(self, game: Game):
+        """ stop the clock of a game that is over and append it to the archive, if there is one """
+        game.stop_clock()
+        if self.archive is not None:
+            self.archive.write(game)
+
+    def get_piece_asset(self, piece: PieceType) -> Div | None:
+        """ return the piece asset of a piece """
         return self.assets.get(str(piece))
 
     def callbacks(self):
         @self.callback(
             Output('chessboard', 'children'),
+            Output('tile_store', 'data'),
             Output('promotion', 'children'),
             Output('selected_tile_store', 'data'),
+            Output('clock_store', 'data'),
             Input({'type': 'tile', 'index': ALL}, 'n_clicks'),
             Input({'type': 'promotion', 'index': ALL}, 'n_clicks'),
-            State('chessboard', 'children'),
+            State('tile_store', 'data'),
             State('selected_tile_store', 'data'),
             State('help_store', 'data'),
             State('game_id_store', 'data'),
+            State('timer_store', 'data'),
             prevent_initial_callback=True
         )
-        def render(tile_clicks, promotion_clicks, tiles, selected_tile_name, is_help_activated, game_id):
+        def render(
+                tile_clicks, promotion_clicks, tile_state, selected_tile_name, is_help_activated, game_id,
+                is_timer_activated
+        ):
             """ render a new frame of the game """
             _ = tile_clicks, promotion_clicks  # unused
 
             if ctx.triggered_id is None:
                 raise PreventUpdate
 
+            game = self.game(game_id)
+            if game is None:
+                # the game expired, reset the board to a new game rather than play the click on the old one
+                game = self.restart(game_id, clock=is_timer_activated)
+                tiles, tile_store = self.update_tiles(game, tile_state, None, is_help_activated)
+                return tiles, tile_store, None, None, self.clock(game)
+
             # check if a promotion event is ongoing
-            promotion_tile = self.game(game_id).which_pawn_promotable()
+            promotion_tile = game.which_pawn_promotable()
 
-            if self.game(game_id).state() == GameState.CHECKMATE \
-                    or self.game(game_id).state() == GameState.OUT_OF_TIME:
+            if self.game_over(game):
                 raise PreventUpdate
             # if clicked on a tile
             elif ctx.triggered_id.get('type') == 'tile':
@@ -304,50 +349,59 @@ class App(Dash):
 
                     game_state = None
                     if selected_tile_name is not None:
-                        self.game(game_id).move(
-                            self.game(game_id).board.tile_by_name(selected_tile_name),
-                            self.game(game_id).board.tile_by_name(triggered_tile_name)
+                        game.move(
+                            game.board.tile_by_name(selected_tile_name),
+                            game.board.tile_by_name(triggered_tile_name)
                         )
 
-                        # check the game state after the move
-                        game_state = self.game(game_id).state()
+                        # check the game state after the move, the clocks stop once the game is over
+                        game_state = game.state()
+                        if self.game_over(game):
+                            self.end_game(game)
+                        self.games.put(game_id, game)
 
                         # deselect after move attempt
                         selected_tile_name = None
                     else:
                         # update which piece is selected
-                        selected_tile_name = self.update_selection(game_id, triggered_tile_name, selected_tile_name)
+                        selected_tile_name = self.update_selection(game, triggered_tile_name, selected_tile_name)
 
-                    self.log(game_id, game_state, selected_tile_name)
+                    self.log(game_id, game, game_state, selected_tile_name)
 
-                    updated_tiles = self.update_tiles(game_id, tiles, selected_tile_name, is_help_activated)
+                    tiles, tile_store = self.update_tiles(game, tile_state, selected_tile_name, is_help_activated)
 
                     # check if a promotion event is triggered
-                    promotion_tile = self.game(game_id).which_pawn_promotable()
+                    promotion_tile = game.which_pawn_promotable()
 
                     if promotion_tile is not None:
                         print('promotion event started')
-                        return updated_tiles, self.init_promotion_tile(game_id, promotion_tile), selected_tile_name
+                        return (
+                            tiles,
+                            tile_store,
+                            self.init_promotion_tile(game, promotion_tile),
+                            selected_tile_name,
+                            self.clock(game)
+                        )
 
                     # if not, finish regular turn
-                    return updated_tiles, None, selected_tile_name
+                    return tiles, tile_store, None, selected_tile_name, self.clock(game)
 
             # if clicked on a promotion tile
             elif ctx.triggered_id.get('type') == 'promotion':
                 # promote the pawn to the selected type
-                self.game(game_id).promote(
+                game.promote(
                     promotion_tile,
                     piece_type=PIECE_TYPE_MAPPER.get(
                         ctx.triggered_id.get('index')
                     )
                 )
+                if self.game_over(game):
+                    self.end_game(game)
+                self.games.put(game_id, game)
                 print('promotion event finished')
 
-                return (
-                    self.update_tiles(game_id, tiles, selected_tile_name, is_help_activated),
-                    None,
-                    selected_tile_name
-                )
+                tiles, tile_store = self.update_tiles(game, tile_state, selected_tile_name, is_help_activated)
+                return tiles, tile_store, None, selected_tile_name, self.clock(game)
             else:
                 raise ValueError()
 
@@ -355,28 +409,31 @@ class App(Dash):
             Output('signal', 'className'),
             Input('chessboard', 'children'),
             Input('new_game_event_store', 'data'),
-            Input('ticker', 'n_intervals'),
+            Input('timeout_store', 'data'),
             State('game_id_store', 'data'),
             prevent_initial_call=True
         )
-        def update_indicator(tile_click, new_game_click, time_tick, game_id):
-            _ = tile_click, new_game_click, time_tick  # unused
+        def update_indicator(tile_click, new_game_click, timeout, game_id):
+            _ = tile_click, new_game_click, timeout  # unused
 
-            # threshold is set to 1 so the marker is updated at the next clock tick, when the clock is at 00:00
-            threshold = 1
-
-            # preventing update if the ticker triggers this callback but the player is not out of time,
-            # so it doesn't calculate whether checkmate is reached every clock tick
-            if ctx.triggered_id == 'ticker' and not self.game(game_id).out_of_time(threshold):
+            # an expired game is restarted by the callbacks that reset the board, which triggers this one again
+            game = self.game(game_id)
+            if game is None:
                 raise PreventUpdate
-
             clss = ['signal']
-            if self.game(game_id).turn == Color.BLACK:
+            if game.turn == Color.BLACK:
                 clss.append('move')
-            if self.game(game_id).check():
+            if game.check():
                 clss.append('check')
-            if self.game(game_id).checkmate() or self.game(game_id).out_of_time(threshold):
-                clss.append('checkmate')
+            if self.game_over(game):
+                clss.append('draw' if game.state() in DRAWS else 'checkmate')
+
+            # the browser reports when a clock reaches 00:00, the server has the final say on whether it has. The clock
+            # is stopped when the game is over, so a game that already ended isn't archived again. While a promotion is
+            # pending the game is archived once the piece is picked instead
+            if ctx.triggered_id == 'timeout_store' and game.clock_running and self.game_over(game):
+                self.end_game(game)
+                self.games.put(game_id, game)
 
             return ' '.join(clss)
 
@@ -387,20 +444,26 @@ class App(Dash):
             Input('game_id_store', 'data'),
             Input('new', 'n_clicks'),
             State('app-container', 'children'),
+            State('timer_store', 'data'),
         )
-        def start(game_id, _, app_elements):
+        def start(game_id, _, app_elements, is_timer_activated):
             if ctx is None:
                 raise PreventUpdate
 
             # init a new game
             _id = str(randint(1, 999_999_999)).zfill(9)
 
+            game = Game()
+            # keep the clock running if the timer is on
+            if is_timer_activated:
+                game.start_clock()
+
             if game_id is not None:
                 print(f'{game_id}: starting new game with id: {_id} (active games: {len(self.games)})')
-                self.games.pop(game_id)
-                self.games |= {_id: Game()}
+                self.games.delete(game_id)
+                self.games.put(_id, game)
             else:
-                self.games |= {_id: Game()}
+                self.games.put(_id, game)
                 print(f'{_id}: starting new game (active games: {len(self.games)})')
 
             # reset the board and the clock
@@ -409,7 +472,11 @@ class App(Dash):
                 ('clocks', self.init_clocks)
             ]:
                 [idx] = [app_elements.index(i) for i in app_elements if i['props']['id'] == component]
-                app_elements[idx]['props']['children'] = [i.to_plotly_json() for i in initializer(_id)]
+                app_elements[idx]['props']['children'] = [i.to_plotly_json() for i in initializer(game)]
+
+            # keep the state of the new board, which the render callback patches
+            [idx] = [app_elements.index(i) for i in app_elements if i['props']['id'] == 'tile_store']
+            app_elements[idx]['props']['data'] = self.tile_state(game, None, False)
 
             return app_elements, _id, 'new_game_started'
 
@@ -437,38 +504,60 @@ class App(Dash):
             Output('clocks', 'className'),
             Output('ticker', 'disabled'),
             Output('timer_store', 'data'),
+            Output('clock_store', 'data', allow_duplicate=True),
+            Output('chessboard', 'children', allow_duplicate=True),
+            Output('tile_store', 'data', allow_duplicate=True),
+            Output('promotion', 'children', allow_duplicate=True),
+            Output('selected_tile_store', 'data', allow_duplicate=True),
             Input('timer', 'n_clicks'),
             State('timer_store', 'data'),
-            prevent_initial_callback=True
+            State('game_id_store', 'data'),
+            State('tile_store', 'data'),
+            State('help_store', 'data'),
+            prevent_initial_call=True
         )
-        def toggle_timer(_, is_timer_activated):
+        def toggle_timer(_, is_timer_activated, game_id, tile_state, is_help_activated):
             if ctx.triggered_id is None:
                 raise PreventUpdate
 
-            # toggle timer attr
+            # toggle timer attr, which stops or starts the clock of the game
+            game = self.game(game_id)
+            board = no_update, no_update, no_update, no_update
+            if game is None:
+                # the game expired, reset the board to a new game
+                game = self.restart(game_id)
+                board = *self.update_tiles(game, tile_state, None, is_help_activated), None, None
+
             if is_timer_activated:
                 is_timer_activated = False
-                return 'timer menu-item', 'clocks', True, is_timer_activated
+                game.stop_clock()
+                self.games.put(game_id, game)
+                return 'timer menu-item', 'clocks', True, is_timer_activated, self.clock(game), *board
 
             is_timer_activated = True
-            return 'timer menu-item on', 'clocks visible', False, is_timer_activated
+            # the clock of a game that is over stays stopped
+            if not self.game_over(game):
+                game.start_clock()
+            self.games.put(game_id, game)
+            return 'timer menu-item on', 'clocks visible', False, is_timer_activated, self.clock(game), *board
+
+        # the clock counts down in the browser, see assets/2_clock.js
+        self.clientside_callback(
+            ClientsideFunction(namespace='clock', function_name='anchor'),
+            Output('clock_anchor_store', 'data'),
+            Input('clock_store', 'data')
+        )
 
-        @self.callback(
+        self.clientside_callback(
+            ClientsideFunction(namespace='clock', function_name='tick'),
             Output('white-clock', 'children'),
             Output('black-clock', 'children'),
+            Output('timeout_store', 'data'),
             Input('ticker', 'n_intervals'),
-            State('white-clock', 'children'),
-            State('black-clock', 'children'),
-            State('game_id_store', 'data'),
+            Input('clock_anchor_store', 'data'),
+            State('timeout_store', 'data'),
             prevent_initial_call=True
         )
-        def tick_timer(_, white_time, black_time, game_id):
-            if self.game(game_id).turn == Color.WHITE:
-                self.game(game_id).update_player_time(Color.WHITE)
-                return time_int_to_str(self.game(game_id).white.time), black_time
-
-            self.game(game_id).update_player_time(Color.BLACK)
-            return white_time, time_int_to_str(self.game(game_id).black.time)
 
 
 if __name__ == '__main__':
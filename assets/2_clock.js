@@ -0,0 +1,51 @@
+/*
+ * The clock of the game, counted down in the browser.
+ *
+ * The server sends the remaining time of both players whenever it changes, i.e. when a move is made or the timer is
+ * toggled, and keeps the authoritative time. The browser counts down the clock of the player whose turn it is from
+ * the moment it received the time, and reports once it reaches 00:00, so the server can confirm it.
+ *
+ * author: David den Uyl (djdenuyl@gmail.com)
+ * date: 2026-10-18
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    clock: {
+        // remember when the remaining time was received, which the countdown starts from
+        anchor: function (clock) {
+            if (!clock) {
+                return null;
+            }
+
+            return Object.assign({}, clock, {received: Date.now()});
+        },
+
+        // return the time of both clocks and, when the player to move ran out of time, their color
+        tick: function (_, clock, timeout) {
+            const no_update = window.dash_clientside.no_update;
+            if (!clock) {
+                return [no_update, no_update, no_update];
+            }
+
+            const remaining = Object.assign({}, clock.remaining);
+            if (clock.running) {
+                remaining[clock.turn] = Math.max(remaining[clock.turn] - (Date.now() - clock.received) / 1000, 0);
+            }
+
+            const out_of_time = clock.running && remaining[clock.turn] === 0 && timeout !== clock.turn;
+
+            return [
+                format(remaining.white),
+                format(remaining.black),
+                out_of_time ? clock.turn : no_update
+            ];
+        }
+    }
+});
+
+// format seconds as MM:SS, rounding up so the clock only shows 00:00 once the time has run out
+function format(seconds) {
+    const total = Math.ceil(seconds);
+    const minutes = Math.floor(total / 60) % 60;
+
+    return `${String(minutes).padStart(2, '0')}:${String(total % 60).padStart(2, '0')}`;
+}
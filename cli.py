@@ -7,6 +7,7 @@ author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-19
 """
 from src.game import Game
+from src.pgn import parse_san, to_pgn
 
 
 def main():
@@ -15,21 +16,29 @@ def main():
 
     playing = True
     while playing:
-        action = input('Enter tile to move piece from and to: (comma separated): ')
+        action = input('Enter a move (e.g. Nf3), or the tiles to move from and to (comma separated), '
+                       'pgn to print the game, q to quit: ')
 
         if action == 'q':
             playing = False
             continue
 
+        if action == 'pgn':
+            print(to_pgn(game))
+            continue
+
         try:
-            frm, to = [a.strip().upper() for a in action.split(',')]
-            print(frm, '->', to)
-            game.move(
-                game.board.tile_by_name(frm),
-                game.board.tile_by_name(to)
-            )
-        except ValueError:
-            print(f'could not parse action: {action}')
+            if ',' not in action:
+                game.make_move(parse_san(game, action))
+            else:
+                frm, to = [a.strip().upper() for a in action.split(',')]
+                print(frm, '->', to)
+                game.move(
+                    game.board.tile_by_name(frm),
+                    game.board.tile_by_name(to)
+                )
+        except ValueError as e:
+            print(f'could not parse action: {action} ({e})')
             continue
 
         game.print()
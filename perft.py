@@ -0,0 +1,46 @@
+"""
+A command line interface for perft, the move generation benchmark and correctness check. Runs the reference positions
+to the given depth, reports the node counts and nodes per second, and exits with 1 if any count is wrong.
+
+usage: python -m perft [--depth N] [--position NAME | --fen FEN] [--divide]
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from argparse import ArgumentParser
+from src.game import Game
+from src.perft import REFERENCE_POSITIONS, ReferencePosition, divide, run
+from sys import exit
+
+
+def main():
+    parser = ArgumentParser(description='count the leaf nodes of the move generation tree of reference positions')
+    parser.add_argument('--depth', type=int, default=3, help='the depth to count to, defaults to 3')
+    parser.add_argument('--position', choices=[p.name for p in REFERENCE_POSITIONS], help='only run this position')
+    parser.add_argument('--fen', help='run this position instead, in Forsyth-Edwards Notation')
+    parser.add_argument('--divide', action='store_true', help='print the node count below each move')
+    args = parser.parse_args()
+
+    if args.fen is not None:
+        positions = [ReferencePosition('fen', lambda: Game.from_fen(args.fen), ())]
+    else:
+        positions = [p for p in REFERENCE_POSITIONS if args.position in (None, p.name)]
+
+    failed = False
+    for position in positions:
+        for depth in range(1, args.depth + 1):
+            result = run(position, depth)
+            failed |= not result.ok
+            expected = f'(expected {result.expected:,})' if result.expected is not None else '(expected unknown)'
+            print(f"{'ok ' if result.ok else 'BAD'} {result.position:<10} depth {depth}: {result.nodes:>12,} nodes "
+                  f"{expected:<24} {result.seconds:8.3f}s {result.nps:>10,.0f} nps")
+
+        if args.divide:
+            for move, nodes in divide(position.setup(), args.depth).items():
+                print(f'    {move}: {nodes:,}')
+
+    exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+The attack map of a position: for each square, the pieces of each color attacking it.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from src.attacks import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks, queen_attacks, rook_attacks
+from src.piece import Pawn, Knight, Bishop, Rook, Queen, King
+from utils.bitboard import EMPTY, bit, squares
+from utils.color import Color
+
+
+@dataclass(frozen=True)
+class AttackMap:
+    """ attackers holds, per color and per square, the bitboard of the pieces of that color attacking the square.
+    targets holds, per square, the bitboard of the squares the piece on that square attacks, and attacked holds, per
+    color, the bitboard of all squares attacked by that color. Attacks on squares occupied by pieces of the same
+    color, i.e. defended pieces, are included """
+    attackers: dict[Color, list[int]]
+    targets: list[int]
+    attacked: dict[Color, int]
+
+    @classmethod
+    def from_board(cls, board: 'Board') -> AttackMap:  # noqa
+        """ compute the attack map of the pieces on a board """
+        occupied = board.occupied
+        pieces = board.pieces
+        targets = [EMPTY] * 64
+        attackers = {}
+        attacked = {}
+
+        for color in Color.members():
+            own = board.colors[color]
+            color_attackers = [EMPTY] * 64
+            color_attacked = EMPTY
+
+            for piece_type, attacks in (
+                    (Pawn, lambda s: PAWN_ATTACKS[color][s]),
+                    (Knight, KNIGHT_ATTACKS.__getitem__),
+                    (Bishop, lambda s: bishop_attacks(s, occupied)),
+                    (Rook, lambda s: rook_attacks(s, occupied)),
+                    (Queen, lambda s: queen_attacks(s, occupied)),
+                    (King, KING_ATTACKS.__getitem__),
+            ):
+                for square in squares(pieces[piece_type] & own):
+                    mask = targets[square] = attacks(square)
+                    color_attacked |= mask
+                    b = bit(square)
+                    for target in squares(mask):
+                        color_attackers[target] |= b
+
+            attackers[color] = color_attackers
+            attacked[color] = color_attacked
+
+        return AttackMap(attackers, targets, attacked)
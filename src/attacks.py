@@ -0,0 +1,115 @@
+"""
+Precomputed attack tables. All tables are built once at import and map a square (see utils.bitboard for the square
+numbering) to the bitboard of squares a piece on that square attacks. Sliding pieces use a ray per direction, which
+is cut off at the first blocking piece.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from utils.bitboard import EMPTY, bit, lsb, msb, neighbors
+from utils.color import Color
+from utils.direction import Direction, DIAGONAL_DIRECTIONS, STRAIGHT_DIRECTIONS
+
+KNIGHT_JUMPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+# directions in which the square index increases, the first blocker on these rays is the lowest set bit
+POSITIVE_DIRECTIONS = (Direction.E, Direction.SE, Direction.S, Direction.SW)
+
+
+def _offset(square: int, dx: int, dy: int) -> int | None:
+    """ return the square at the offset (dx, dy) from square, or None when that falls off the board. A positive dy
+    points north, i.e. towards rank 8, which is the top row of the board """
+    x, y = square % 8 + dx, square // 8 - dy
+    if 0 <= x < 8 and 0 <= y < 8:
+        return y * 8 + x
+
+
+def _jumps(square: int, offsets: tuple[tuple[int, int], ...]) -> int:
+    """ return the bitboard of all squares reachable from square by one of the offsets """
+    mask = EMPTY
+    for dx, dy in offsets:
+        if (target := _offset(square, dx, dy)) is not None:
+            mask |= bit(target)
+
+    return mask
+
+
+def _ray(square: int, direction: Direction) -> int:
+    """ return the bitboard of all squares from square (exclusive) to the edge of the board in a direction """
+    mask = EMPTY
+    while (square := _offset(square, *direction.value)) is not None:
+        mask |= bit(square)
+
+    return mask
+
+
+KNIGHT_ATTACKS = [_jumps(s, KNIGHT_JUMPS) for s in range(64)]
+KING_ATTACKS = [neighbors(bit(s)) for s in range(64)]
+PAWN_ATTACKS = {
+    Color.WHITE: [_jumps(s, (Direction.NE.value, Direction.NW.value)) for s in range(64)],
+    Color.BLACK: [_jumps(s, (Direction.SE.value, Direction.SW.value)) for s in range(64)],
+}
+RAYS = {d: [_ray(s, d) for s in range(64)] for d in STRAIGHT_DIRECTIONS + DIAGONAL_DIRECTIONS}
+
+
+def _between(frm: int, to: int) -> int:
+    """ return the bitboard of the squares strictly between two squares on a shared line, else an empty board """
+    for rays in RAYS.values():
+        if rays[frm] & bit(to):
+            return rays[frm] & ~rays[to] & ~bit(to)
+
+    return EMPTY
+
+
+BETWEEN = [[_between(f, t) for t in range(64)] for f in range(64)]
+
+
+def _positive_ray_attacks(rays: list[int], square: int, occupied: int) -> int:
+    """ return the attacks along a ray in which the square index increases, the first blocker is the lowest bit """
+    ray = rays[square]
+    if blockers := ray & occupied:
+        return ray ^ rays[lsb(blockers)]
+
+    return ray
+
+
+def _negative_ray_attacks(rays: list[int], square: int, occupied: int) -> int:
+    """ return the attacks along a ray in which the square index decreases, the first blocker is the highest bit """
+    ray = rays[square]
+    if blockers := ray & occupied:
+        return ray ^ rays[msb(blockers)]
+
+    return ray
+
+
+_N, _E, _S, _W = (RAYS[d] for d in STRAIGHT_DIRECTIONS)
+_NE, _SE, _SW, _NW = (RAYS[d] for d in DIAGONAL_DIRECTIONS)
+
+
+def ray_attacks(square: int, occupied: int, direction: Direction) -> int:
+    """ return the squares attacked from square in a direction, up to and including the first occupied square """
+    if direction in POSITIVE_DIRECTIONS:
+        return _positive_ray_attacks(RAYS[direction], square, occupied)
+
+    return _negative_ray_attacks(RAYS[direction], square, occupied)
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    """ return the squares attacked by a rook on square, given the occupied squares """
+    return _negative_ray_attacks(_N, square, occupied) \
+        | _positive_ray_attacks(_E, square, occupied) \
+        | _positive_ray_attacks(_S, square, occupied) \
+        | _negative_ray_attacks(_W, square, occupied)
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    """ return the squares attacked by a bishop on square, given the occupied squares """
+    return _negative_ray_attacks(_NE, square, occupied) \
+        | _positive_ray_attacks(_SE, square, occupied) \
+        | _positive_ray_attacks(_SW, square, occupied) \
+        | _negative_ray_attacks(_NW, square, occupied)
+
+
+def queen_attacks(square: int, occupied: int) -> int:
+    """ return the squares attacked by a queen on square, given the occupied squares """
+    return rook_attacks(square, occupied) | bishop_attacks(square, occupied)
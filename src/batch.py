@@ -0,0 +1,207 @@
+"""
+Batch analysis of positions with NumPy. Boards are encoded as rows of 64 int8 values, one per square in the order of
+the board (A8 first, H1 last): 0 for an empty square, 1 to 6 for a white pawn, knight, bishop, rook, queen and king,
+and -1 to -6 for the black pieces. The player to move is given separately, 1 for white and -1 for black.
+
+Whether a position is legal, whether the player to move is in check and the static evaluation are computed for all
+positions at once. Only checkmate needs the move generator, so it is decided with a Game for the positions in check.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import numpy as np
+from dataclasses import dataclass
+from src.attacks import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, POSITIVE_DIRECTIONS, RAYS
+from src.board import PIECE_TYPES
+from src.evaluation import SQUARE_VALUES
+from src.fen import PIECE_LETTERS
+from src.game import Game
+from typing import Iterable, Optional
+from utils.bitboard import squares
+from utils.color import Color
+from utils.direction import DIAGONAL_DIRECTIONS, STRAIGHT_DIRECTIONS
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+PIECE_CODES = {piece_type: code for code, piece_type in enumerate(PIECE_TYPES, start=1)}
+WHITE, BLACK = 1, -1
+
+# the square beyond the board, which is always empty, to pad the rays with
+_OFF_BOARD = 64
+
+# a FEN placement is expanded to a character per square: the empty squares to dots, and the row separators dropped
+_EXPAND = str.maketrans({str(n): '.' * n for n in range(1, 9)} | {'/': None})
+# the piece code of each character of an expanded placement, by its ASCII code, and which characters are valid
+_LETTER_CODES = np.zeros(256, dtype=np.int8)
+_VALID_LETTERS = np.zeros(256, dtype=bool)
+_VALID_LETTERS[ord('.')] = True
+for _piece_type, _code in PIECE_CODES.items():
+    _LETTER_CODES[ord(PIECE_LETTERS[_piece_type].upper())] = WHITE * _code
+    _LETTER_CODES[ord(PIECE_LETTERS[_piece_type])] = BLACK * _code
+    _VALID_LETTERS[ord(PIECE_LETTERS[_piece_type].upper())] = _VALID_LETTERS[ord(PIECE_LETTERS[_piece_type])] = True
+
+
+def _mask(bitboards: list[int]) -> np.ndarray:
+    """ return a (64, 64) boolean array from a bitboard per square """
+    return np.array([[bool(b >> t & 1) for t in range(64)] for b in bitboards])
+
+
+def _rays(directions: tuple) -> np.ndarray:
+    """ return the squares of the rays in given directions from each square, ordered outwards and padded with the
+    square beyond the board, as an array of shape (directions, 64, 7) """
+    rays = np.full((len(directions), 64, 7), _OFF_BOARD, dtype=np.int64)
+    for i, direction in enumerate(directions):
+        for square in range(64):
+            ray = sorted(squares(RAYS[direction][square]), reverse=direction not in POSITIVE_DIRECTIONS)
+            rays[i, square, :len(ray)] = ray
+
+    return rays
+
+
+KNIGHT_MASK = _mask(KNIGHT_ATTACKS)
+KING_MASK = _mask(KING_ATTACKS)
+# the squares from which a pawn of the opponent attacks a king of given color on a square
+PAWN_MASK = {WHITE: _mask(PAWN_ATTACKS[Color.WHITE]), BLACK: _mask(PAWN_ATTACKS[Color.BLACK])}
+STRAIGHT_RAYS = _rays(STRAIGHT_DIRECTIONS)
+DIAGONAL_RAYS = _rays(DIAGONAL_DIRECTIONS)
+
+# the value of each piece code on each square from the perspective of white, indexed by code + 6
+VALUES = np.zeros((13, 64), dtype=np.int32)
+for _piece_type, _code in PIECE_CODES.items():
+    VALUES[6 + _code] = SQUARE_VALUES[Color.WHITE][_piece_type]
+    VALUES[6 - _code] = [-v for v in SQUARE_VALUES[Color.BLACK][_piece_type]]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """ the analysis of a batch of positions. Check, checkmate and the evaluation are only meaningful for legal
+    positions; they are False and 0 for the others. The evaluation is in centipawns from the perspective of the
+    player to move """
+    legal: np.ndarray
+    check: np.ndarray
+    checkmate: np.ndarray
+    evaluation: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.legal)
+
+
+def encode(game: Game) -> np.ndarray:
+    """ return the board of a game as a row of 64 piece codes """
+    row = np.zeros(64, dtype=np.int8)
+    for piece_type, code in PIECE_CODES.items():
+        for color, sign in ((Color.WHITE, WHITE), (Color.BLACK, BLACK)):
+            row[list(squares(game.board.piece_mask(piece_type, color)))] = sign * code
+
+    return row
+
+
+def encode_fens(fens: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """ return the boards and the players to move of positions in Forsyth-Edwards Notation. Only the placement and
+    the player to move are read, straight into the arrays, without setting up a game. Raises a ValueError if these
+    fields can't be parsed """
+    placements, turns = [], []
+    for fen in fens:
+        fields = fen.split()
+        rows = [row.translate(_EXPAND) for row in fields[0].split('/')] if fields else []
+        if len(fields) < 2 or len(rows) != 8 or any(len(row) != 8 for row in rows) or fields[1] not in ('w', 'b'):
+            raise ValueError(f'could not parse FEN: {fen}')
+        placements.extend(rows)
+        turns.append(WHITE if fields[1] == 'w' else BLACK)
+
+    letters = np.frombuffer(''.join(placements).encode('ascii'), dtype=np.uint8)
+    if not _VALID_LETTERS[letters].all():
+        raise ValueError('unknown piece in FEN placement')
+
+    return _LETTER_CODES[letters].reshape(-1, 64), np.array(turns, dtype=np.int8)
+
+
+def to_fen(board: np.ndarray, turn: int = WHITE) -> str:
+    """ return the FEN of an encoded board, without castling rights or en passant square """
+    letters = {sign * code: PIECE_LETTERS[piece_type].upper() if sign == WHITE else PIECE_LETTERS[piece_type]
+               for piece_type, code in PIECE_CODES.items() for sign in (WHITE, BLACK)}
+
+    rows = []
+    for r in range(8):
+        row, empty = '', 0
+        for value in board[r * 8:r * 8 + 8]:
+            if value == 0:
+                empty += 1
+                continue
+            row += (str(empty) if empty else '') + letters[int(value)]
+            empty = 0
+        rows.append(row + (str(empty) if empty else ''))
+
+    return f'{"/".join(rows)} {"w" if turn == WHITE else "b"} - - 0 1'
+
+
+def in_check(boards: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """ return for each board whether the king of given color (1 or -1) is attacked. Boards without such a king are
+    not in check """
+    n = len(boards)
+    rows = np.arange(n)
+    colors = colors.astype(np.int8)[:, None]
+    kings = boards == colors * KING
+    has_king = kings.any(axis=1)
+    king = kings.argmax(axis=1)
+
+    enemy = -colors
+    check = (KNIGHT_MASK[king] & (boards == enemy * KNIGHT)).any(axis=1)
+    check |= (KING_MASK[king] & (boards == enemy * KING)).any(axis=1)
+    for sign in (WHITE, BLACK):
+        side = colors[:, 0] == sign
+        check[side] |= (PAWN_MASK[sign][king[side]] & (boards[side] == -sign * PAWN)).any(axis=1)
+
+    # the first piece along each ray from the king, or 0 if there is none
+    padded = np.concatenate([boards, np.zeros((n, 1), dtype=boards.dtype)], axis=1)
+    for rays, slider in ((STRAIGHT_RAYS, ROOK), (DIAGONAL_RAYS, BISHOP)):
+        for ray in rays:
+            pieces = padded[rows[:, None], ray[king]]
+            first = pieces[rows, (pieces != 0).argmax(axis=1)]
+            check |= (first == enemy[:, 0] * slider) | (first == enemy[:, 0] * QUEEN)
+
+    return check & has_king
+
+
+def is_legal(boards: np.ndarray, turns: np.ndarray) -> np.ndarray:
+    """ return for each board whether the position is legal: both players have exactly one king, there are no pawns
+    on the first or last rank, and the player who just moved isn't in check """
+    legal = ((boards == KING).sum(axis=1) == 1) & ((boards == -KING).sum(axis=1) == 1)
+    legal &= ~(np.abs(boards[:, :8]) == PAWN).any(axis=1) & ~(np.abs(boards[:, 56:]) == PAWN).any(axis=1)
+    legal &= (np.abs(boards) <= KING).all(axis=1)
+
+    return legal & ~in_check(boards, -turns)
+
+
+def evaluate(boards: np.ndarray, turns: np.ndarray) -> np.ndarray:
+    """ return the evaluation of each board in centipawns from the perspective of the player to move, the same as
+    src.evaluation.evaluate """
+    values = VALUES[np.clip(boards, -KING, KING).astype(np.int64) + 6, np.arange(64)].sum(axis=1)
+
+    return values * turns.astype(np.int32)
+
+
+def analyse(boards: np.ndarray, turns: Optional[np.ndarray] = None, fens: Optional[list[str]] = None) -> BatchResult:
+    """ analyse a batch of encoded boards, of shape (N, 64). The players to move default to white. Checkmate is
+    decided by the move generator, from the FEN of the positions if given, which keeps their castling rights and
+    en passant square, or else from the board """
+    boards = np.asarray(boards, dtype=np.int8).reshape(-1, 64)
+    turns = np.full(len(boards), WHITE, dtype=np.int8) if turns is None else np.asarray(turns, dtype=np.int8)
+
+    legal = is_legal(boards, turns)
+    check = in_check(boards, turns) & legal
+    evaluation = np.where(legal, evaluate(boards, turns), 0)
+
+    checkmate = np.zeros(len(boards), dtype=bool)
+    for i in np.flatnonzero(check):
+        fen = fens[i] if fens is not None else to_fen(boards[i], turns[i])
+        checkmate[i] = not Game.from_fen(fen).legal_moves()
+
+    return BatchResult(legal, check, checkmate, evaluation)
+
+
+def analyse_fens(fens: Iterable[str]) -> BatchResult:
+    """ analyse a batch of positions in Forsyth-Edwards Notation """
+    fens = list(fens)
+    boards, turns = encode_fens(fens)
+
+    return analyse(boards, turns, fens)
@@ -3,105 +3,187 @@ author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-19
 """
 from dataclasses import dataclass, field
-from itertools import chain
-from src.piece import PieceType, Blank, Knight, Pawn
+from src.attacks import BETWEEN, KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks, rook_attacks
+from src.piece import BLANK, PieceType, Blank, Knight, Pawn, Bishop, Rook, Queen, King
 from src.tile import Tile
-from typing import Optional, Type, Iterator
+from src.zobrist import PIECE_KEYS
+from typing import Optional, Type
+from utils.bitboard import EMPTY, FULL, bit, squares
 from utils.color import Color, opponent
 from utils.letters import LETTERS
-from utils.vector import get_vector
+
+PIECE_TYPES = (Pawn, Knight, Bishop, Rook, Queen, King)
 
 
 @dataclass
 class Board:
+    """ The board keeps a bitboard per piece type and per color as the source for all queries, next to a list with
+    the piece on each square. The tiles are a view on the board, e.g. for rendering, which is only built once asked
+    for and then kept in sync. Pieces must therefore be placed and removed using set_piece and remove_piece, instead
+    of by assigning to a tile directly. The zobrist key of the placement of the pieces is updated along the way.
+    Tiles are looked up by square, index or name in constant time, using a flat sequence of the tiles and a map of
+    the tile names to their square. """
     height: int = 8
     width: int = 8
-    tiles: list[list[Tile]] = field(init=False)
+    pieces: dict[Type[PieceType], int] = field(init=False, repr=False)
+    colors: dict[Color, int] = field(init=False, repr=False)
+    mailbox: list[PieceType] = field(init=False, repr=False)
+    key: int = field(init=False, repr=False)
+    _tiles: Optional[list[list[Tile]]] = field(init=False, default=None, repr=False)
+    _flat: Optional[tuple[Tile, ...]] = field(init=False, default=None, repr=False)
+    _squares: dict[str, int] = field(init=False, repr=False)
 
     def __post_init__(self):
         self.__init_board()
 
     def __init_board(self):
         """ initialize an empty game board """
-        self.tiles = [
-            [
-                Tile(LETTERS[w], self.height - h) for w in range(self.width)
-            ] for h in range(self.height)
-        ]
+        self.pieces = {piece_type: EMPTY for piece_type in PIECE_TYPES}
+        self.colors = {color: EMPTY for color in Color.members()}
+        self.mailbox = [BLANK] * (self.height * self.width)
+        self.key = 0
+        self._squares = {
+            f'{LETTERS[w]}{self.height - h}': h * self.width + w for h in range(self.height) for w in range(self.width)
+        }
+
+    @property
+    def tiles(self) -> list[list[Tile]]:
+        """ the tiles of the board, row by row from the top """
+        if self._tiles is None:
+            self._tiles = [
+                [
+                    Tile(LETTERS[w], self.height - h, self.mailbox[h * self.width + w]) for w in range(self.width)
+                ] for h in range(self.height)
+            ]
+            self._flat = tuple(t for row in self._tiles for t in row)
+
+        return self._tiles
+
+    @property
+    def flat(self) -> tuple[Tile, ...]:
+        """ return the tiles as a flat sequence, indexed by square """
+        if self._flat is None:
+            _ = self.tiles
+
+        return self._flat
 
     @property
-    def flat(self) -> Iterator:
-        """ return a flattened unnested chain of tiles"""
-        return chain(*self.tiles)
+    def occupied(self) -> int:
+        """ return the bitboard of all occupied squares """
+        return self.colors[Color.WHITE] | self.colors[Color.BLACK]
+
+    def square(self, tile: Tile) -> int:
+        """ return the square (i.e. the bit index) of a tile """
+        return (self.height - tile.y) * self.width + tile.x_int
+
+    def tile_by_square(self, square: int) -> Tile:
+        """ return the tile at a square """
+        return self.flat[square]
+
+    def piece_at(self, square: int) -> PieceType:
+        """ return the piece at a square """
+        return self.mailbox[square]
+
+    def piece_type_at(self, square: int) -> Optional[Type[PieceType]]:
+        """ return the type of the piece at a square, or None if the square is empty """
+        piece = self.mailbox[square]
+        return None if isinstance(piece, Blank) else type(piece)
+
+    def tiles_by_mask(self, mask: int) -> list[Tile]:
+        """ return the tiles of all squares set in the bitboard """
+        return [self.tile_by_square(s) for s in squares(mask)]
+
+    def piece_mask(self, piece_type: Type[PieceType], color: Optional[Color] = None) -> int:
+        """ return the bitboard of the squares containing a particular piece, optionally also by its color """
+        mask = FULL ^ self.occupied if piece_type is Blank else self.pieces.get(piece_type, EMPTY)
+
+        if color is None:
+            return mask
+
+        return mask & self.colors.get(color, FULL ^ self.occupied)
+
+    def attackers(self, square: int, color: Color, occupied: Optional[int] = None) -> int:
+        """ return the bitboard of the pieces of given color that attack a square. Optionally, provide the occupied
+        squares to use for the sliding pieces, to see what would attack the square if the occupation was different"""
+        if occupied is None:
+            occupied = self.occupied
+
+        pieces = self.pieces
+        return (
+            PAWN_ATTACKS[opponent(color)][square] & pieces[Pawn]
+            | KNIGHT_ATTACKS[square] & pieces[Knight]
+            | KING_ATTACKS[square] & pieces[King]
+            | bishop_attacks(square, occupied) & (pieces[Bishop] | pieces[Queen])
+            | rook_attacks(square, occupied) & (pieces[Rook] | pieces[Queen])
+        ) & self.colors[color]
+
+    def put_piece(self, square: int, piece: PieceType):
+        """ place a piece on an empty square """
+        b = bit(square)
+        self.pieces[type(piece)] |= b
+        self.colors[piece.color] |= b
+        self.key ^= PIECE_KEYS[piece.color][type(piece)][square]
+        self.mailbox[square] = piece
+        if self._tiles is not None:
+            self.tile_by_square(square).piece = piece
+
+    def take_piece(self, square: int) -> PieceType:
+        """ remove the piece from a square, leaving it blank, and return the piece that was removed """
+        piece = self.mailbox[square]
+        if not isinstance(piece, Blank):
+            b = bit(square)
+            self.pieces[type(piece)] ^= b
+            self.colors[piece.color] ^= b
+            self.key ^= PIECE_KEYS[piece.color][type(piece)][square]
+            self.mailbox[square] = BLANK
+            if self._tiles is not None:
+                self.tile_by_square(square).piece = BLANK
+
+        return piece
+
+    def set_piece(self, tile: Tile, piece: PieceType):
+        """ place a piece on a tile, replacing whatever was there """
+        self.take_piece(self.square(tile))
+        if not isinstance(piece, Blank):
+            self.put_piece(self.square(tile), piece)
+
+    def remove_piece(self, tile: Tile):
+        """ remove the piece from a tile, leaving it blank """
+        self.take_piece(self.square(tile))
 
     def tile_by_index(self, idx) -> Tile:
         """ return a tile by its index """
-        return list(chain(*self.tiles))[idx]
+        return self.tile_by_square(idx)
 
     def tile_by_name(self, name) -> Tile:
         """ return a tile by its name """
-        tile, *_ = [t for t in list(chain(*self.tiles)) if t.name == name]
-        return tile
+        return self.flat[self._squares[name]]
 
     def tiles_by_color(self, color: Color) -> list[Tile]:
         """ return all tiles occupied by a piece of given color"""
-        return [t for t in self.flat if t.piece.color == color]
+        return self.tiles_by_mask(self.colors.get(color, FULL ^ self.occupied))
 
     def tiles_by_piece_type(self, piece_type: Type[PieceType], color: Optional[Color] = None) -> list[Tile]:
         """ return the tiles containing a particular piece, optionally also by its color"""
-        if color is None:
-            return [t for t in self.flat if isinstance(t.piece, piece_type)]
-
-        return [t for t in self.flat if isinstance(t.piece, piece_type) and t.piece.color == color]
+        return self.tiles_by_mask(self.piece_mask(piece_type, color))
 
     def index_by_name(self, name) -> int:
         """ return a tile index by its name"""
-        return [i for i, tile in enumerate(chain(*self.tiles)) if tile.name == name][0]
+        return self._squares[name]
 
     def surrounding_tiles(self, tile: Tile):
         """ return the tiles surrounding the given tile """
-        surrounding_tiles = []
-        for t in self.flat:
-            if t.x_int - tile.x_int in (-1, 0, 1) \
-                    and t.y - tile.y in (-1, 0, 1) \
-                    and t != tile:
-                surrounding_tiles.append(t)
-
-        return surrounding_tiles
+        return self.tiles_by_mask(KING_ATTACKS[self.square(tile)])
 
     def opponent_tiles(self, color: Color) -> list[Tile]:
         """ return all the tiles occupied by the opponent of the given color. """
-        return [
-            t for t in self.flat if t.piece.color == opponent(color) and not isinstance(t.piece, Blank)
-        ]
+        return self.tiles_by_mask(self.colors[opponent(color)])
 
     def tiles_between(self, frm: Tile, to: Tile) -> list[Tile]:
         """ return all the tiles between two tiles. Will only return tiles for on-axis and diagonal comparisons.
         Will return an empty list for knights. """
         # only knights ignore the clear path rule, other pieces obey
         if not isinstance(frm.piece, Knight):
-            x_idx = self._horizontal_indices_between(frm, to)
-            y_idx = self._vertical_indices_between(frm, to)
-
-            return [self.tiles[self.height - y][x] for x, y in zip(x_idx, y_idx)]
+            return self.tiles_by_mask(BETWEEN[self.square(frm)][self.square(to)])
 
         return []
-
-    @staticmethod
-    def _horizontal_indices_between(frm: Tile, to: Tile) -> range:
-        """ collect the axis indices horizontally between the frm and to tile"""
-        drc, lng = get_vector(frm, to)
-        return range(frm.x_int + drc.value[0], to.x_int, drc.value[0] or 1) or [frm.x_int] * (abs(lng.dy) - 1)
-
-    @staticmethod
-    def _vertical_indices_between(frm: Tile, to: Tile) -> range:
-        """ collect the axis indices vertically between the frm and to tile"""
-        drc, lng = get_vector(frm, to)
-        return range(frm.y + drc.value[1], to.y, drc.value[1] or 1) or [frm.y] * (abs(lng.dx) - 1)
-
-    def reset_passable_pawns(self, color: Color):
-        """ resets the is_passable attr to False for all pawns of Color 'color'"""
-        pawn_tiles = self.tiles_by_piece_type(Pawn, color)
-        for p in pawn_tiles:
-            if isinstance(p.piece, Pawn):
-                self.tiles[self.height - p.y][p.x_int].piece.is_passable = False
@@ -0,0 +1,361 @@
+"""
+A computer opponent. Searches the moves of a game with negamax alpha-beta and iterative deepening within a time
+budget, followed by a quiescence search of the captures at the leaves. Results are kept in a transposition table,
+which is shared between the searches of an engine. Moves are ordered by the best move found earlier for the position,
+then most valuable victim / least valuable attacker for captures, then killer moves and the history heuristic for
+quiet moves.
+
+The ParallelEngine spreads the root moves over a pool of worker processes, each of which searches its share with an
+engine of its own, so the search is not bound to a single core by the GIL. The number of workers defaults to the
+ENGINE_WORKERS environment variable, or else the number of cores.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from os import cpu_count, environ
+from src.evaluation import PIECE_VALUES, evaluate
+from src.game import Game
+from src.move import NO_MOVE, Move, decode_move, encode_move
+from src.piece import King
+from src.transposition import Bound, TranspositionTable
+from threading import Lock
+from time import perf_counter, time
+from typing import Optional
+from utils.bitboard import lsb
+from utils.color import opponent
+
+MATE = 100_000
+INFINITY = MATE + 1
+MAX_PLY = 128
+WORKERS = int(environ.get('ENGINE_WORKERS', cpu_count() or 1))
+
+
+class _Timeout(Exception):
+    """ raised inside the search once the time budget is spent """
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """ the outcome of a search: the best move found, its score in centipawns from the perspective of the player to
+    move, the depth of the last completed iteration, and the number of nodes searched """
+    move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    seconds: float
+
+    @property
+    def nps(self) -> float:
+        """ nodes per second """
+        return self.nodes / self.seconds if self.seconds else 0.
+
+
+class Engine:
+    def __init__(self, time_limit: float = 1., max_depth: int = 64, hash_size: float = 16):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.table = TranspositionTable(hash_size)
+        self.nodes = 0
+        self._deadline = 0.
+        self._killers: list[list[Optional[Move]]] = []
+        self._history: dict[tuple[int, int], int] = {}
+
+    @property
+    def table_size(self) -> float:
+        """ the memory taken by the transposition table in MB """
+        return self.table.size / (1024 * 1024)
+
+    def search(
+            self,
+            game: Game,
+            time_limit: Optional[float] = None,
+            max_depth: Optional[int] = None,
+            moves: Optional[list[Move]] = None
+    ) -> SearchResult:
+        """ search the best move for the player whose turn it is. Stops once the time limit (in seconds) is spent or
+        the max depth is reached, and returns the result of the last completed iteration. Optionally, restrict the
+        search to a subset of the legal moves. The game is left in the position it was given in """
+        time_limit = self.time_limit if time_limit is None else time_limit
+        max_depth = self.max_depth if max_depth is None else max_depth
+
+        start = perf_counter()
+        self._deadline = start + time_limit
+        self.nodes = 0
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history = {}
+
+        root_moves = self._order(game.legal_moves() if moves is None else list(moves), 0)
+        if not root_moves:
+            score = -MATE if self._in_check(game) else 0
+            return SearchResult(None, score, 0, 0, perf_counter() - start)
+
+        best_move, best_score, depth_reached = root_moves[0], -INFINITY, 0
+        history_length = len(game.history)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self._search_root(game, root_moves, depth)
+            except _Timeout:
+                # take back the moves of the interrupted iteration
+                while len(game.history) > history_length:
+                    game.unmake_move()
+                break
+
+            best_move, best_score, depth_reached = move, score, depth
+
+            # search the best move first in the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+
+            if abs(score) >= MATE - MAX_PLY:
+                break
+
+        return SearchResult(best_move, best_score, depth_reached, self.nodes, perf_counter() - start)
+
+    def _search_root(self, game: Game, moves: list[Move], depth: int) -> tuple[int, Move]:
+        """ search all root moves to depth and return the best score and move """
+        alpha, best_move = -INFINITY, moves[0]
+        for move in moves:
+            game.make_move(move)
+            score = -self._negamax(game, depth - 1, -INFINITY, -alpha, 1)
+            game.unmake_move()
+
+            if score > alpha:
+                alpha, best_move = score, move
+
+        return alpha, best_move
+
+    def _negamax(self, game: Game, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """ the alpha-beta search, returns the score of the position from the perspective of the player to move """
+        self._tick()
+
+        # a position that occurred before is scored as a draw, as the player who repeated it can repeat it again
+        if game.repetitions > 1 or game.halfmove_clock >= 100:
+            return 0
+
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiescence(game, alpha, beta, ply)
+
+        key = game.key
+        entry = self.table.probe(key)
+        table_move = NO_MOVE
+        if entry is not None:
+            table_move = entry.move
+            if entry.depth >= depth:
+                score = _from_table(entry.score, ply)
+                if entry.bound == Bound.EXACT \
+                        or entry.bound == Bound.LOWER and score >= beta \
+                        or entry.bound == Bound.UPPER and score <= alpha:
+                    return score
+
+        moves = game.legal_moves()
+        if not moves:
+            return -MATE + ply if self._in_check(game) else 0
+
+        alpha_original = alpha
+        best, best_move = -INFINITY, None
+        for move in self._order(moves, ply, table_move):
+            game.make_move(move)
+            score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.unmake_move()
+
+            if score > best:
+                best, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if move.captured is None and move.promotion is None:
+                    self._store_killer(move, ply)
+                    self._history[move.frm, move.to] = self._history.get((move.frm, move.to), 0) + depth * depth
+                break
+
+        if best <= alpha_original:
+            # none of the moves raised alpha, so the best move is not known
+            bound, best_move = Bound.UPPER, None
+        elif best >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.table.store(
+            key, depth, _to_table(best, ply), bound, encode_move(best_move) if best_move is not None else NO_MOVE
+        )
+
+        return best
+
+    def _quiescence(self, game: Game, alpha: int, beta: int, ply: int) -> int:
+        """ search only the captures and promotions until the position is quiet, so the static evaluation isn't taken
+        in the middle of an exchange """
+        self._tick()
+
+        stand_pat = evaluate(game.board, game.turn)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = [m for m in game.legal_moves() if m.captured is not None or m.promotion is not None]
+        for move in sorted(captures, key=self._capture_score, reverse=True):
+            game.make_move(move)
+            score = -self._quiescence(game, -beta, -alpha, ply + 1)
+            game.unmake_move()
+
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    @staticmethod
+    def _capture_score(move: Move) -> int:
+        """ most valuable victim / least valuable attacker """
+        score = 10 * PIECE_VALUES[move.captured] - PIECE_VALUES[move.piece] if move.captured is not None else 0
+        if move.promotion is not None:
+            score += PIECE_VALUES[move.promotion]
+
+        return score
+
+    def _order(self, moves: list[Move], ply: int, table_move: int = NO_MOVE) -> list[Move]:
+        """ order the moves: the best move from the transposition table first, then captures and promotions, then the
+        killer moves, then by the history heuristic """
+        killers = self._killers[ply] if ply < len(self._killers) else ()
+
+        def score(move: Move) -> int:
+            if table_move and encode_move(move) == table_move:
+                return 1 << 31
+            if move.captured is not None or move.promotion is not None:
+                return (1 << 30) + self._capture_score(move)
+            if move in killers:
+                return 1 << 29
+            return self._history.get((move.frm, move.to), 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def _store_killer(self, move: Move, ply: int):
+        """ remember a quiet move that caused a cutoff, two per ply """
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def _tick(self):
+        """ count a node and check the time budget every 1024 nodes """
+        self.nodes += 1
+        if not self.nodes & 1023 and perf_counter() > self._deadline:
+            raise _Timeout
+
+    @staticmethod
+    def _in_check(game: Game) -> bool:
+        """ whether the player to move is in check, without building the attack map of the position """
+        king = lsb(game.board.piece_mask(King, game.turn))
+        return bool(game.board.attackers(king, opponent(game.turn)))
+
+
+class ParallelEngine(Engine):
+    def __init__(self, time_limit: float = 1., max_depth: int = 64, hash_size: float = 16, workers: int = WORKERS):
+        super().__init__(time_limit, max_depth, hash_size)
+        self.workers = workers
+
+    def search(
+            self,
+            game: Game,
+            time_limit: Optional[float] = None,
+            max_depth: Optional[int] = None,
+            moves: Optional[list[Move]] = None
+    ) -> SearchResult:
+        """ search the best move, splitting the root moves over the worker processes. Each worker deepens its share
+        on its own, so the depth reported is the least depth completed by all of them """
+        moves = game.legal_moves() if moves is None else list(moves)
+        if self.workers <= 1 or len(moves) <= 1:
+            return super().search(game, time_limit, max_depth, moves)
+
+        time_limit = self.time_limit if time_limit is None else time_limit
+        max_depth = self.max_depth if max_depth is None else max_depth
+
+        start = perf_counter()
+        # deal the ordered moves round-robin, so every worker gets some of the promising ones
+        moves = self._order(moves, 0)
+        shares = [moves[i::self.workers] for i in range(min(self.workers, len(moves)))]
+        # the workers replay the game rather than set up the position, so they know the positions to repeat
+        history = [encode_move(m) for m in game.moves]
+        futures = [
+            _pool(self.workers).submit(
+                _search_share, game.start_fen, history, [encode_move(m) for m in share], time() + time_limit,
+                max_depth, self.table_size
+            ) for share in shares
+        ]
+        results = [f.result() for f in futures]
+
+        code, score, _, _ = max(results, key=lambda r: r[1])
+        return SearchResult(
+            move=decode_move(code, moves),
+            score=score,
+            depth=min(r[2] for r in results),
+            nodes=sum(r[3] for r in results),
+            seconds=perf_counter() - start
+        )
+
+
+# the pools of worker processes, shared by all parallel engines in this process. Workers are spawned rather than
+# forked, as forking a process that runs threads (e.g. those of the web server) is unsafe
+_pools: dict[int, ProcessPoolExecutor] = {}
+# the app searches from several threads, which must not each create a pool
+_pools_lock = Lock()
+
+# the engine of a worker process, which keeps its transposition table from one search to the next
+_worker_engine: Optional[Engine] = None
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """ return the pool with given number of worker processes, which is created on first use """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+
+    return _pools[workers]
+
+
+def _search_share(
+        fen: str,
+        history: list[int],
+        codes: list[int],
+        deadline: float,
+        max_depth: int,
+        hash_size: float
+) -> tuple[int, int, int, int]:
+    """ search a share of the root moves of the game, given by its starting position and the moves made, in a worker
+    process until the deadline (in seconds since the epoch, as the clocks of the processes are not comparable
+    otherwise). Returns the encoded best move, its score, the depth reached and the number of nodes searched """
+    global _worker_engine
+    if _worker_engine is None or _worker_engine.table_size != hash_size:
+        _worker_engine = Engine(hash_size=hash_size)
+
+    game = Game.from_moves(history, fen=fen)
+    legal_moves = game.legal_moves()
+    moves = [decode_move(code, legal_moves) for code in codes]
+    result = _worker_engine.search(game, max(deadline - time(), 0.), max_depth, moves)
+
+    return encode_move(result.move), result.score, result.depth, result.nodes
+
+
+def _to_table(score: int, ply: int) -> int:
+    """ mate scores are relative to the root of the search. Store them relative to the position instead, so they
+    remain valid when the position is found at another ply """
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+
+    return score
+
+
+def _from_table(score: int, ply: int) -> int:
+    """ convert a mate score from the transposition table back to relative to the root of the search """
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+
+    return score
@@ -0,0 +1,99 @@
+"""
+Static evaluation of positions: the material on the board plus a bonus or penalty for the square each piece is on.
+The piece-square tables are those of the simplified evaluation function by Tomasz Michniewski.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from src.piece import PieceType, Pawn, Knight, Bishop, Rook, Queen, King
+from typing import Type
+from utils.bitboard import squares
+from utils.color import Color
+
+PIECE_VALUES: dict[Type[PieceType], int] = {Pawn: 100, Knight: 320, Bishop: 330, Rook: 500, Queen: 900, King: 0}
+
+# the tables are given from the perspective of white, with A8 as the first square, i.e. as they appear on the board.
+# for black, the square is mirrored vertically
+PIECE_SQUARE_TABLES: dict[Type[PieceType], list[int]] = {
+    Pawn: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    Knight: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    Bishop: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    Rook: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    Queen: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    King: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+# the value of a piece on a square, per color, combining the material and the piece-square tables
+SQUARE_VALUES: dict[Color, dict[Type[PieceType], list[int]]] = {
+    Color.WHITE: {p: [PIECE_VALUES[p] + t[s] for s in range(64)] for p, t in PIECE_SQUARE_TABLES.items()},
+    Color.BLACK: {p: [PIECE_VALUES[p] + t[s ^ 56] for s in range(64)] for p, t in PIECE_SQUARE_TABLES.items()},
+}
+
+
+def evaluate(board: 'Board', color: Color) -> int:  # noqa
+    """ return the evaluation of the pieces on the board in centipawns, from the perspective of the given color """
+    score = 0
+    white, black = board.colors[Color.WHITE], board.colors[Color.BLACK]
+    for piece_type, mask in board.pieces.items():
+        white_values = SQUARE_VALUES[Color.WHITE][piece_type]
+        black_values = SQUARE_VALUES[Color.BLACK][piece_type]
+        for square in squares(mask & white):
+            score += white_values[square]
+        for square in squares(mask & black):
+            score -= black_values[square]
+
+    return score if color == Color.WHITE else -score
@@ -0,0 +1,22 @@
+"""
+Forsyth-Edwards Notation (FEN) of positions, e.g. the start position:
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from src.move import CastlingRight
+from src.piece import Pawn, Knight, Bishop, Rook, Queen, King
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# the letters of the pieces, in lowercase for black and uppercase for white
+PIECE_LETTERS = {Pawn: 'p', Knight: 'n', Bishop: 'b', Rook: 'r', Queen: 'q', King: 'k'}
+LETTER_PIECES = {letter: piece_type for piece_type, letter in PIECE_LETTERS.items()}
+
+CASTLING_LETTERS = {
+    CastlingRight.WHITE_KINGSIDE: 'K',
+    CastlingRight.WHITE_QUEENSIDE: 'Q',
+    CastlingRight.BLACK_KINGSIDE: 'k',
+    CastlingRight.BLACK_QUEENSIDE: 'q',
+}
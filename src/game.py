@@ -5,272 +5,560 @@ and check and checkmate checking.
 author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-19
 """
-from itertools import compress
+from src.attack_map import AttackMap
+from src.attacks import BETWEEN, KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks, queen_attacks, \
+    rook_attacks
+from src.fen import CASTLING_LETTERS, LETTER_PIECES, PIECE_LETTERS, START_FEN
+from src.move import Move, MoveFlag, CastlingRight, Undo, CASTLINGS, CASTLING_RIGHTS_LOST, CASTLING_SQUARES, \
+    PAWN_STEP, PAWN_START_ROW, PROMOTION_ROW, PROMOTION_TYPES, decode_move, encode_move
 from src.piece import Blank, King, PieceType, Pawn, Queen, Bishop, Knight, Rook
 from src.player import WhitePlayer, BlackPlayer
 from src.state import State
 from src.tile import Tile
+from src.zobrist import CASTLING_KEYS, EN_PASSANT_KEYS, SIDE_KEY, placement_key, state_key
 from src.board import Board
-from typing import Iterator, Optional, Type
+from time import monotonic
+from typing import Iterable, Iterator, Optional, Type
+from utils.bitboard import EMPTY, FULL, LIGHT_SQUARES, SQUARE_NAMES, bit, lsb, squares
+from utils.cache import per_position
 from utils.color import Color, opponent
 from utils.letters import LETTERS
-from utils.vector import get_vector
 
 
 class Game:
-    def __init__(self, time: int = 20 * 60):
+    def __init__(self, time: int = 20 * 60, fen: str = START_FEN):
         self.board = Board()
         self.time = time
         self.white = WhitePlayer(self.time)
         self.black = BlackPlayer(self.time)
         self.players = {Color.WHITE: self.white, Color.BLACK: self.black}
         self.turn = Color.WHITE
-        self._init_pieces()
+        self.castling = CastlingRight.NONE
+        self.en_passant: Optional[int] = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.history: list[Undo] = []
+        self._promotion_pending = False
+        # the moment the clock of the player whose turn it is was started, or None if the clock is stopped
+        self._clock_started: Optional[float] = None
+        self.start_fen = fen
+        self._set_fen(fen)
+        self._key = state_key(self.turn, self.castling, self.en_passant)
+        # the number of times each position has occurred in the game, by key, kept up to date by make/unmake
+        self._repetitions: dict[int, int] = {self.key: 1}
+
+    @classmethod
+    def from_fen(cls, fen: str, time: int = 20 * 60) -> 'Game':
+        """ create a game from a position in Forsyth-Edwards Notation """
+        return cls(time=time, fen=fen)
+
+    @property
+    def moves(self) -> list[Move]:
+        """ the moves made in the game, in order """
+        return [undo.move for undo in self.history]
+
+    def to_record(self) -> dict:
+        """ return a compact record of the game, from which it can be restored: the starting position, the moves
+        made (in their 16-bit encoding) and the clocks """
+        return {
+            'fen': self.start_fen,
+            'moves': [encode_move(undo.move) for undo in self.history],
+            'time': self.time,
+            'remaining': [self.white.time, self.black.time],
+            'clock_started': self._clock_started,
+            'promotion_pending': self._promotion_pending
+        }
+
+    @classmethod
+    def from_moves(cls, moves: Iterable[int], fen: str = START_FEN, time: int = 20 * 60) -> 'Game':
+        """ create a game by playing the moves, in their 16-bit encoding, from a starting position. Raises a
+        ValueError on an illegal move """
+        game = cls(time=time, fen=fen)
+        for code in moves:
+            move = decode_move(code, game.legal_moves())
+            if move is None:
+                raise ValueError(f'illegal move {code} at ply {len(game.history) + 1}')
+            game.make_move(move)
+
+        return game
+
+    @classmethod
+    def from_record(cls, record: dict) -> 'Game':
+        """ restore a game from a record, by replaying its moves from the starting position """
+        game = cls.from_moves(record['moves'], fen=record['fen'], time=record['time'])
+        game.white.time, game.black.time = record['remaining']
+        game._clock_started = record['clock_started']
+        game._promotion_pending = record['promotion_pending']
+
+        return game
+
+    def _set_fen(self, fen: str):
+        """ set up the position of an empty board from a FEN string. The halfmove clock and fullmove number may be
+        left out. Raises a ValueError if the string can't be parsed """
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise ValueError(f'expected 4 or 6 fields in FEN, got {len(fields)}: {fen}')
+
+        placement, turn, castling, en_passant, *clocks = fields
+
+        rows = placement.split('/')
+        if len(rows) != self.board.height:
+            raise ValueError(f'expected {self.board.height} rows in FEN placement, got {len(rows)}: {fen}')
+
+        for r, row in enumerate(rows):
+            square = r * self.board.width
+            for letter in row:
+                if letter.isdigit():
+                    square += int(letter)
+                elif (piece_type := LETTER_PIECES.get(letter.lower())) is not None:
+                    if square >= (r + 1) * self.board.width:
+                        raise ValueError(f'row {r + 1} of FEN placement exceeds the board width: {fen}')
+                    self.board.put_piece(square, piece_type(Color.WHITE if letter.isupper() else Color.BLACK))
+                    square += 1
+                else:
+                    raise ValueError(f'unknown piece {letter!r} in FEN: {fen}')
+
+            if square != (r + 1) * self.board.width:
+                raise ValueError(f'row {r + 1} of FEN placement does not match the board width: {fen}')
+
+        for color in Color.members():
+            if self.board.piece_mask(King, color).bit_count() != 1:
+                raise ValueError(f'expected exactly one {color.value} king in FEN: {fen}')
+
+        if turn not in ('w', 'b'):
+            raise ValueError(f'unknown player to move {turn!r} in FEN: {fen}')
+        self.turn = Color.WHITE if turn == 'w' else Color.BLACK
+
+        for right, letter in CASTLING_LETTERS.items():
+            if letter in castling:
+                castling_ = CASTLINGS[right]
+                # only keep the rights of which the king and rook are still in place
+                if self.board.piece_mask(King, castling_.color) & bit(castling_.king_frm) \
+                        and self.board.piece_mask(Rook, castling_.color) & bit(castling_.rook_frm):
+                    self.castling |= right
+
+        if en_passant != '-':
+            if en_passant.upper() not in SQUARE_NAMES:
+                raise ValueError(f'unknown en passant square {en_passant!r} in FEN: {fen}')
+            passed = SQUARE_NAMES.index(en_passant.upper())
+            # only keep the en passant square if a pawn can actually take en passant, like make_move does
+            if PAWN_ATTACKS[opponent(self.turn)][passed] & self.board.piece_mask(Pawn, self.turn):
+                self.en_passant = passed
+
+        if clocks:
+            try:
+                self.halfmove_clock, self.fullmove_number = int(clocks[0]), int(clocks[1])
+            except ValueError:
+                raise ValueError(f'could not parse the clocks in FEN: {fen}')
+
+    def to_fen(self) -> str:
+        """ return the position in Forsyth-Edwards Notation """
+        rows = []
+        for r in range(self.board.height):
+            row, empty = '', 0
+            for piece in self.board.mailbox[r * self.board.width:(r + 1) * self.board.width]:
+                if isinstance(piece, Blank):
+                    empty += 1
+                    continue
+                letter = PIECE_LETTERS[type(piece)]
+                row += (str(empty) if empty else '') + (letter.upper() if piece.color == Color.WHITE else letter)
+                empty = 0
+            rows.append(row + (str(empty) if empty else ''))
+
+        castling = ''.join(letter for right, letter in CASTLING_LETTERS.items() if right & self.castling) or '-'
+        en_passant = SQUARE_NAMES[self.en_passant].lower() if self.en_passant is not None else '-'
+
+        return f"{'/'.join(rows)} {'w' if self.turn == Color.WHITE else 'b'} {castling} {en_passant} " \
+               f"{self.halfmove_clock} {self.fullmove_number}"
+
+    @property
+    def key(self) -> int:
+        """ the zobrist key of the position, i.e. the placement of the pieces, the player to move, the castling
+        rights and the en passant square, which is kept up to date incrementally with every move """
+        return self.board.key ^ self._key
+
+    def compute_key(self) -> int:
+        """ compute the zobrist key of the position from scratch """
+        return placement_key(self.board.pieces, self.board.colors) \
+            ^ state_key(self.turn, self.castling, self.en_passant)
 
-    def _init_pieces(self):
-        for player in self.players.values():
-            for k, v in player.start_positions.items():
-                for t in v:
-                    self.board.tiles[self.board.height - t.y][t.x_int].piece = k(player.color)
-
-    def _is_valid_move(self, frm: Tile, to: Tile) -> bool:
-        """ check if the piece on the 'frm' Tile is allowed to move to the 'to' Tile"""
-        return frm.piece.is_valid_move(frm, to) and self._has_clear_path(frm, to)
-
-    def _has_clear_path(self, frm: Tile, to: Tile) -> bool:
-        """ check if there are any pieces between the 'frm' tile and 'to' tile. return False if there are any"""
-        tiles = self.board.tiles_between(frm, to)
-
-        # if any of the tiles between frm and to is not a Blank tile, the path is not clear
-        for t in tiles:
-            if not isinstance(t.piece, Blank):
-                return False
+    def valid_moves(self, tile: Tile) -> Iterator[Tile]:
+        """ returns a list of all tiles that the piece occupying the tile can legally reach within one move. A
+        castling move is represented by the tile of the rook the king castles with """
+        square = self.board.square(tile)
+        targets = EMPTY
+        for m in self.legal_moves():
+            if m.frm == square:
+                targets |= bit(CASTLINGS[self._castling_right(m)].rook_frm if m.flag is MoveFlag.CASTLING else m.to)
+
+        return iter(self.board.tiles_by_mask(targets))
+
+    @staticmethod
+    def _castling_right(move: Move) -> CastlingRight:
+        """ return the castling right used by a castling move """
+        [right] = [r for r, c in CASTLINGS.items() if c.king_frm == move.frm and c.king_to == move.to]
+        return right
+
+    def _pinned(self, king: int, color: Color) -> int:
+        """ return the bitboard of the pieces of given color that are pinned to their king on square 'king' """
+        pieces, occupied = self.board.pieces, self.board.occupied
+        snipers = (
+            rook_attacks(king, EMPTY) & (pieces[Rook] | pieces[Queen])
+            | bishop_attacks(king, EMPTY) & (pieces[Bishop] | pieces[Queen])
+        ) & self.board.colors[opponent(color)]
+
+        pinned = EMPTY
+        for sniper in squares(snipers):
+            between = BETWEEN[king][sniper] & occupied
+            # a piece is pinned if it is the only piece between the king and the sniper
+            if between and not between & (between - 1):
+                pinned |= between & self.board.colors[color]
+
+        return pinned
+
+    def _exposes_king(self, king: int, frm: int, to: int, captured: int = EMPTY) -> bool:
+        """ check whether moving a piece frm -> to, optionally taking the piece on square 'captured', leaves the
+        king on square 'king' under attack. The board itself is left untouched """
+        occupied = (self.board.occupied ^ bit(frm) | bit(to)) & ~captured
+        return bool(self.board.attackers(king, opponent(self.turn), occupied) & ~bit(to) & ~captured)
+
+    def legal_moves(self) -> list[Move]:
+        """ return all legal moves for the player whose turn it is, including castling, en passant and promotion"""
+        color, enemy_color = self.turn, opponent(self.turn)
+        board = self.board
+        pieces = board.pieces
+        own, enemy = board.colors[color], board.colors[enemy_color]
+        occupied = own | enemy
+        king = lsb(pieces[King] & own)
+        checkers = board.attackers(king, enemy_color)
+        moves = []
+
+        # the king can't move to an attacked square. It is left out of the occupied squares when checking this,
+        # so it can't step back along the line of a sliding piece that has it in check
+        for to in squares(KING_ATTACKS[king] & ~own):
+            if not board.attackers(to, enemy_color, occupied ^ bit(king)):
+                moves.append(Move(king, to, King, captured=board.piece_type_at(to)))
+
+        # in double check, only the king can move
+        if checkers & (checkers - 1):
+            return moves
+
+        # in check, a move has to take the piece checking the king or block its path
+        if checkers:
+            evasions = checkers | BETWEEN[king][lsb(checkers)]
+        else:
+            evasions = FULL
+            for right, castling in CASTLINGS.items():
+                if right & self.castling and castling.color == color \
+                        and not occupied & castling.empty \
+                        and not any(board.attackers(s, enemy_color) for s in squares(castling.safe)):
+                    moves.append(Move(castling.king_frm, castling.king_to, King, MoveFlag.CASTLING))
 
-        return True
+        pinned = self._pinned(king, color)
 
-    def valid_moves(self, tile: Tile) -> Iterator[Tile]:
-        """ returns a list of all tiles that the piece occupying the tile can reach within one move """
-        valid_moves = [self._is_valid_move(tile, board_tile) for board_tile in self.board.flat]
+        def add(frm_: int, to_: int, piece_type: Type[PieceType], flag: MoveFlag = MoveFlag.QUIET):
+            if pinned & bit(frm_) and self._exposes_king(king, frm_, to_):
+                return
 
-        # the opponents to which the piece can make a valid move
-        return compress(self.board.flat, valid_moves)
+            captured = board.piece_type_at(to_)
+            if flag is MoveFlag.PROMOTION:
+                moves.extend(Move(frm_, to_, piece_type, flag, captured, p) for p in PROMOTION_TYPES)
+            else:
+                moves.append(Move(frm_, to_, piece_type, flag, captured))
+
+        # pawns
+        step = PAWN_STEP[color]
+        promotion_row = PROMOTION_ROW[color]
+        en_passant = self.en_passant
+        for frm in squares(pieces[Pawn] & own):
+            to = frm + step
+            flag = MoveFlag.PROMOTION if to // 8 == promotion_row else MoveFlag.QUIET
+            if not occupied & bit(to):
+                if evasions & bit(to):
+                    add(frm, to, Pawn, flag)
+                if frm // 8 == PAWN_START_ROW[color] and not occupied & bit(to + step) and evasions & bit(to + step):
+                    add(frm, to + step, Pawn, MoveFlag.DOUBLE_PUSH)
+            for to in squares(PAWN_ATTACKS[color][frm] & enemy & evasions):
+                add(frm, to, Pawn, flag)
+            if en_passant is not None and PAWN_ATTACKS[color][frm] & bit(en_passant) \
+                    and not self._exposes_king(king, frm, en_passant, bit(en_passant - step)):
+                moves.append(Move(frm, en_passant, Pawn, MoveFlag.EN_PASSANT, Pawn))
+
+        # the other pieces
+        targets = ~own & evasions
+        for frm in squares(pieces[Knight] & own):
+            for to in squares(KNIGHT_ATTACKS[frm] & targets):
+                add(frm, to, Knight)
+        for frm in squares(pieces[Bishop] & own):
+            for to in squares(bishop_attacks(frm, occupied) & targets):
+                add(frm, to, Bishop)
+        for frm in squares(pieces[Rook] & own):
+            for to in squares(rook_attacks(frm, occupied) & targets):
+                add(frm, to, Rook)
+        for frm in squares(pieces[Queen] & own):
+            for to in squares(queen_attacks(frm, occupied) & targets):
+                add(frm, to, Queen)
+
+        return moves
+
+    @property
+    @per_position
+    def attack_map(self) -> AttackMap:
+        """ the attack map of the current position, which is computed once per position """
+        return AttackMap.from_board(self.board)
 
     def is_threatening(self, tile: Tile) -> Iterator[Tile]:
         """ returns a list of all opponent occupied tiles that the tile can reach within one move """
-        opponent_tiles = self.board.opponent_tiles(self.turn)
+        targets = self.attack_map.targets[self.board.square(tile)]
 
-        valid_moves = [self._is_valid_move(tile, opponent_tile) for opponent_tile in opponent_tiles]
-
-        # the opponents to which the piece can make a valid move
-        return compress(opponent_tiles, valid_moves)
+        return iter(self.board.tiles_by_mask(targets & self.board.colors[opponent(self.turn)]))
 
     def is_under_thread_by(self, tile: Tile, if_not_for_tile: Optional[Tile] = None) -> Iterator[Tile]:
         """ returns a list of all opponent occupied tiles that can reach the tile within one move. Optionally,
-        provide a 'if_not_for' Tile, which will be removed during the identification of valid moves,
-        then placed back. Thereby making the check to see if the tile would be under threat if the 'if_not_for_tile'
-        wasn't present"""
-        opponent_tiles = self.board.opponent_tiles(self.turn)
-
+        provide a 'if_not_for' Tile, which is considered empty during the identification of valid moves. Thereby
+        making the check to see if the tile would be under threat if the 'if_not_for_tile' wasn't present"""
+        square = self.board.square(tile)
         if if_not_for_tile is None:
-            valid_moves = [self._is_valid_move(opponent_tile, tile) for opponent_tile in opponent_tiles]
+            return iter(self.board.tiles_by_mask(self.attack_map.attackers[opponent(self.turn)][square]))
+
+        occupied = self.board.occupied & ~bit(self.board.square(if_not_for_tile))
+        return iter(self.board.tiles_by_mask(self.board.attackers(square, opponent(self.turn), occupied)))
+
+    def _find_move(self, frm: int, to: int, promotion: Type[PieceType]) -> Optional[Move]:
+        """ find the legal move of a piece from square frm to square to. Castling can be done by moving the king two
+        squares, or by moving the king onto the rook or vice versa """
+        for m in self.legal_moves():
+            if m.flag is MoveFlag.CASTLING:
+                rook = CASTLINGS[self._castling_right(m)].rook_frm
+                if (frm, to) in ((m.frm, m.to), (m.frm, rook), (rook, m.frm)):
+                    return m
+            elif m.frm == frm and m.to == to and m.promotion in (None, promotion):
+                return m
+
+    def make_move(self, move: Move):
+        """ make a legal move and push the information to take it back onto the history """
+        board = self.board
+        color = self.turn
+        undo = Undo(move, None, self.castling, self.en_passant, self.halfmove_clock, self._key)
+        key = self._key ^ SIDE_KEY
+
+        if move.flag is MoveFlag.EN_PASSANT:
+            undo.captured = board.take_piece(move.to - PAWN_STEP[color])
+        elif move.captured is not None:
+            undo.captured = board.take_piece(move.to)
+
+        piece = board.take_piece(move.frm)
+        board.put_piece(move.to, piece if move.promotion is None else move.promotion(color))
+
+        if move.flag is MoveFlag.CASTLING:
+            castling = CASTLINGS[self._castling_right(move)]
+            board.put_piece(castling.rook_to, board.take_piece(castling.rook_frm))
+
+        # moving a king or rook, or taking a rook, loses the castling rights involved
+        if self.castling and (bit(move.frm) | bit(move.to)) & CASTLING_SQUARES:
+            for square in (move.frm, move.to):
+                if square in CASTLING_RIGHTS_LOST:
+                    self.castling &= ~CASTLING_RIGHTS_LOST[square]
+            key ^= CASTLING_KEYS[undo.castling] ^ CASTLING_KEYS[self.castling]
+
+        # the square passed by a double pawn push can be taken en passant by the opponent during the next turn
+        if self.en_passant is not None:
+            key ^= EN_PASSANT_KEYS[self.en_passant % 8]
+            self.en_passant = None
+        if move.flag is MoveFlag.DOUBLE_PUSH:
+            passed = move.frm + PAWN_STEP[color]
+            if PAWN_ATTACKS[color][passed] & board.piece_mask(Pawn, opponent(color)):
+                self.en_passant = passed
+                key ^= EN_PASSANT_KEYS[passed % 8]
+
+        if move.piece is Pawn or move.captured is not None:
+            self.halfmove_clock = 0
         else:
-            h_piece = if_not_for_tile.piece
-            self.board.tiles[self.board.height - if_not_for_tile.y][if_not_for_tile.x_int].piece = Blank()
-            valid_moves = [self._is_valid_move(opponent_tile, tile) for opponent_tile in opponent_tiles]
-            self.board.tiles[self.board.height - if_not_for_tile.y][if_not_for_tile.x_int].piece = h_piece
-
-        # if any of the opponents pieces can make a valid move to the piece
-        return compress(opponent_tiles, valid_moves)
-
-    def _is_under_threat(self, tile: Tile, if_not_for_tile: Optional[Tile] = None) -> bool:
-        """ check if a tile is reachable by a piece from the opponent within one move. See _is_under_thread_by()
-        for an explanation of the 'is_not_for_tile' parameter"""
-        # if any of the opponents pieces can make a valid move to the piece
-        if any(self.is_under_thread_by(tile, if_not_for_tile)):
-            return True
+            self.halfmove_clock += 1
 
-        return False
+        if color == Color.BLACK:
+            self.fullmove_number += 1
 
-    def _cant_move_king(self) -> bool:
-        """ check if the player whose turn it is can move his king from its current tile"""
-        [king_tile] = self.board.tiles_by_piece_type(King, self.turn)
-        surrounding_tiles = self.board.surrounding_tiles(king_tile)
-
-        # king can be moved if there is any move that is valid and not under threat, return negation of that.
-        # NB. A tile is considered to be under threat if an opposing piece can be moved there if it was occupied
-        # by a piece (here the King) of the players color. Moreover, the if_not_for argument is used to move the
-        # king temporarily for the checking of whether the tile is under threat --
-        # effectively the king is moved temporarily.
-        return not any(
-            [self._is_valid_move(king_tile, s)
-             and not self._is_under_threat(Tile(s.x, s.y, king_tile.piece), if_not_for_tile=king_tile)
-             for s in surrounding_tiles]
-        )
-
-    def _can_move_piece_between_king(self) -> bool:
-        """ checks if any piece can be moved between the king and any piece threatening the king
-        TODO: does this also work for double checks?"""
-        [king_tile] = self.board.tiles_by_piece_type(King, self.turn)
-        threatening_tiles = self.is_under_thread_by(king_tile)
-        own_tiles = self.board.tiles_by_color(self.turn)
-
-        for threatening_tile in threatening_tiles:
-            between_tiles = self.board.tiles_between(threatening_tile, king_tile)
-            for between_tile in between_tiles:
-                for own_tile in own_tiles:
-                    return self._is_valid_move(own_tile, between_tile)
+        self.turn = opponent(color)
+        self._key = key
+        key = self.key
+        self._repetitions[key] = self._repetitions.get(key, 0) + 1
+        self.history.append(undo)
+        self._promotion_pending = False
 
-        return False
+    def unmake_move(self) -> Optional[Move]:
+        """ take back the last move made and return it, restoring the position before the move """
+        if not self.history:
+            return
 
-    def _can_take_piece_threatening_king(self) -> bool:
-        """ checks if any piece can take the piece threatening the king"""
-        [king_tile] = self.board.tiles_by_piece_type(King, self.turn)
-        threatening_tiles = self.is_under_thread_by(king_tile)
-        if any([self._is_under_threat(tt) for tt in threatening_tiles]):
-            return True
+        undo = self.history.pop()
+        move = undo.move
+        board = self.board
+        color = opponent(self.turn)
 
-        return False
+        key = self.key
+        if self._repetitions[key] == 1:
+            del self._repetitions[key]
+        else:
+            self._repetitions[key] -= 1
 
-    def _en_passant(self, frm: Tile, to: Tile) -> Optional[Tile]:
-        """ checks whether the move is eligible for en passant. Return the pawn that is passed if it is en passant"""
-        direction, length = get_vector(frm, to)
-
-        neighbor_tile = self.board.tiles[self.board.height - frm.y][frm.x_int + direction.value[0]]
-
-        if isinstance(frm.piece, Pawn) \
-                and frm.piece.is_valid_diagonal_move(direction, length) \
-                and isinstance(neighbor_tile.piece, Pawn) \
-                and neighbor_tile.piece.color != frm.piece.color \
-                and neighbor_tile.piece.is_passable:
-            return neighbor_tile
-
-    def _castle(self, frm: Tile, to: Tile) -> bool:
-        """ checks whether the move is eligible for castling."""
-        if (isinstance(frm.piece, King) or isinstance(to.piece, King)) \
-                and (isinstance(frm.piece, Rook) or isinstance(to.piece, Rook)) \
-                and frm.piece.color == to.piece.color \
-                and not frm.piece.has_moved \
-                and not to.piece.has_moved \
-                and self._has_clear_path(frm, to) \
-                and not any(self._is_under_threat(tile) for tile in self.board.tiles_between(frm, to)) \
-                and not self.check():
-            return True
+        if move.flag is MoveFlag.CASTLING:
+            castling = CASTLINGS[self._castling_right(move)]
+            board.put_piece(castling.rook_frm, board.take_piece(castling.rook_to))
 
-        return False
+        piece = board.take_piece(move.to)
+        board.put_piece(move.frm, piece if move.promotion is None else move.piece(color))
 
-    def _resolve_castle(self, frm: Tile, to: Tile):
-        """ take all actions needed to accomplish a castling move, i.e. moving and updating the King and Rook"""
-        [k_tile] = self.board.tiles_by_piece_type(King, self.turn)
-        [r_tile] = [r for r in self.board.tiles_by_piece_type(Rook, self.turn) if r in (frm, to)]
-        kx = k_tile.x_int + 2 if r_tile.x == 'H' else k_tile.x_int - 2
-        rx = kx - 1 if r_tile.x == 'H' else kx + 1
-        self.board.tiles[self.board.height - k_tile.y][kx].piece = k_tile.piece
-        self.board.tiles[self.board.height - k_tile.y][kx].piece.has_moved = True
-        self.board.tiles[self.board.height - r_tile.y][rx].piece = r_tile.piece
-        self.board.tiles[self.board.height - r_tile.y][rx].piece.has_moved = True
-        self.board.tiles[self.board.height - to.y][to.x_int].piece = Blank()
-
-    def move(self, frm: Tile, to: Tile):
-        """ move a piece"""
-        # reset pawns of the player whose turn it is to not passable
-        self.board.reset_passable_pawns(self.turn)
-
-        # check if en passant rule applies
-        passable_pawn_tile = self._en_passant(frm, to)
-
-        # check move conditions
-        if (self._is_valid_move(frm, to) or passable_pawn_tile is not None or self._castle(frm, to)) \
-                and frm.piece.color == self.turn:
-            frm_piece = frm.piece
-            to_piece = to.piece
-
-            # update the tiles
-            if self._castle(frm, to):
-                self._resolve_castle(frm, to)
-            else:
-                # update the 'to' tile in case of a regular turn and that the piece (now at the 'to' tile) has moved
-                self.board.tiles[self.board.height - to.y][to.x_int].piece = frm_piece
-                self.board.tiles[self.board.height - to.y][to.x_int].piece.has_moved = True
+        if move.flag is MoveFlag.EN_PASSANT:
+            board.put_piece(move.to - PAWN_STEP[color], undo.captured)
+        elif undo.captured is not None:
+            board.put_piece(move.to, undo.captured)
 
-            # the frm tile is always left empty
-            self.board.tiles[self.board.height - frm.y][frm.x_int].piece = Blank()
+        if color == Color.BLACK:
+            self.fullmove_number -= 1
 
-            # if the move results in a check state, revert the move
-            if self.check():
-                self.board.tiles[self.board.height - to.y][to.x_int].piece = to_piece
-                self.board.tiles[self.board.height - frm.y][frm.x_int].piece = frm_piece
-                return
+        self.turn = color
+        self.castling = undo.castling
+        self.en_passant = undo.en_passant
+        self.halfmove_clock = undo.halfmove_clock
+        self._key = undo.key
+        self._promotion_pending = False
+
+        return move
 
-            # if the move is a valid en-passant move, remove the pawn that was passed
-            if passable_pawn_tile is not None:
-                self.board.tiles[self.board.height - passable_pawn_tile.y][passable_pawn_tile.x_int].piece = Blank()
+    def move(self, frm: Tile, to: Tile, promotion: Optional[Type[PieceType]] = None):
+        """ move a piece, if the move is legal for the player whose turn it is. When a pawn reaches the other side
+        without a promotion given, it is promoted to a queen until promote() is called to pick the piece"""
+        move = self._find_move(self.board.square(frm), self.board.square(to), promotion or Queen)
+        if move is None:
+            return
 
-            # set the turn to the other player
-            self.turn = opponent(self.turn)
+        self._charge_clock()
+        self.make_move(move)
+        self._promotion_pending = move.promotion is not None and promotion is None
 
+    @per_position
     def check(self) -> bool:
         """ checks for the player who's turn it is whether its king is in check"""
-        [king_tile] = self.board.tiles_by_piece_type(King, self.turn)
+        king = lsb(self.board.piece_mask(King, self.turn))
 
-        return self._is_under_threat(king_tile)
+        return bool(self.attack_map.attackers[opponent(self.turn)][king])
 
+    @per_position
     def checkmate(self) -> bool:
-        """ checks for the player who's turn it is whether its checkmate
-        TODO: checkmate found when pawn could be moved between piece (Qw) and king (Kb)
-        """
-        # 1) the king is in check
-        # 2) all tiles around the king are either an invalid move for the king or result in a check
-        # 3) and no piece can be put in between the king and the piece that has the king in check
-        # 4) no piece can take the piece that has the king in check
-        if self.check() \
-                and self._cant_move_king() \
-                and not self._can_move_piece_between_king() \
-                and not self._can_take_piece_threatening_king():
+        """ checks for the player who's turn it is whether its checkmate, i.e. the king is in check and there is no
+        legal move to get out of it"""
+        return self.check() and not self.legal_moves()
+
+    @per_position
+    def stalemate(self) -> bool:
+        """ checks for the player who's turn it is whether its stalemate, i.e. the king is not in check but there is
+        no legal move """
+        return not self.check() and not self.legal_moves()
+
+    @property
+    def repetitions(self) -> int:
+        """ the number of times the current position has occurred in the game, counting the position itself. Positions
+        are the same if the pieces, the player to move, the castling rights and the en passant square are """
+        return self._repetitions.get(self.key, 0)
+
+    def threefold_repetition(self) -> bool:
+        """ checks whether the current position has occurred three times, which draws the game """
+        return self.repetitions >= 3
+
+    def fifty_moves(self) -> bool:
+        """ checks whether both players made fifty moves without moving a pawn or capturing, which draws the game """
+        return self.halfmove_clock >= 100
+
+    @per_position
+    def insufficient_material(self) -> bool:
+        """ checks whether neither player has the pieces left to checkmate, i.e. only the kings remain with at most a
+        single knight or bishop, or with bishops that all stand on squares of the same color """
+        board = self.board
+        if board.piece_mask(Pawn) | board.piece_mask(Rook) | board.piece_mask(Queen):
+            return False
+
+        knights, bishops = board.piece_mask(Knight), board.piece_mask(Bishop)
+        if (knights | bishops).bit_count() <= 1:
             return True
 
-        return False
+        return not knights and (not bishops & LIGHT_SQUARES or not bishops & ~LIGHT_SQUARES)
 
-    def out_of_time(self, threshold: int = 0) -> bool:
+    def out_of_time(self, threshold: float = 0) -> bool:
         """ check for the player who's turn it is whether they're out of time. Threshold determines when
          a player is out of time. default to 0 seconds """
-        if self.players.get(self.turn).time == threshold:
+        if self.remaining_time(self.turn) <= threshold:
             return True
 
         return False
 
+    def start_clock(self):
+        """ start the clock of the player whose turn it is, if it isn't running already """
+        if self._clock_started is None:
+            self._clock_started = monotonic()
+
+    def stop_clock(self):
+        """ stop the clock, charging the player whose turn it is for the time spent so far """
+        self._charge_clock()
+        self._clock_started = None
+
+    @property
+    def clock_running(self) -> bool:
+        """ whether the clock is running """
+        return self._clock_started is not None
+
+    def remaining_time(self, color: Color) -> float:
+        """ return the remaining time of a player in seconds, including the time spent on the current move """
+        time = self.players.get(color).time
+        if color == self.turn and self._clock_started is not None:
+            time -= monotonic() - self._clock_started
+
+        return max(time, 0.)
+
+    def _charge_clock(self):
+        """ subtract the time spent since the clock was last started from the player whose turn it is. The time is
+        only accounted for when a move is made, rather than counted down every second """
+        if self._clock_started is not None:
+            now = monotonic()
+            player = self.players.get(self.turn)
+            player.time = max(player.time - (now - self._clock_started), 0.)
+            self._clock_started = now
+
     def promote(self, pawn_tile: Tile, piece_type: Type[PieceType]):
-        """ promotes a pawn to another piece when it reaches the other side """
-        if not isinstance(pawn_tile.piece, Pawn) \
-                or not any(piece_type == p for p in (Queen, Bishop, Knight, Rook)):
+        """ promotes the pawn that reached the other side during the last move to another piece """
+        if self.which_pawn_promotable() != pawn_tile or piece_type not in PROMOTION_TYPES:
             return
 
-        self.board.tiles[self.board.height - pawn_tile.y][pawn_tile.x_int].piece = \
-            piece_type(color=pawn_tile.piece.color)
+        move = self.unmake_move()
+        self.make_move(Move(move.frm, move.to, move.piece, move.flag, move.captured, piece_type))
 
     def which_pawn_promotable(self) -> Optional[Tile]:
-        """ checks if any pawn of the player whose turn it is, is in a position to be promoted and returns the
-        tile containing the pawn that is promotable"""
-        for tile in self.board.tiles_by_piece_type(Pawn):
-            if tile.y in (1, 8):
-                return tile
+        """ returns the tile of the pawn that reached the other side during the last move, if its promotion is yet to
+        be picked """
+        if self._promotion_pending:
+            return self.board.tile_by_square(self.history[-1].move.to)
 
     def state(self) -> Optional[State]:
-        """ return the current game state """
+        """ return the current game state. check, checkmate, stalemate and insufficient material are memoised for the
+        position and the draw rules are kept track of as moves are made, so asking for the state repeatedly only
+        repeats the clock check. Running out of time ends the game, so it is reported rather than check """
         if self.checkmate():
             return State.CHECKMATE
-        elif self.check():
-            return State.CHECK
+        elif self.stalemate():
+            return State.STALEMATE
+        elif self.threefold_repetition():
+            return State.THREEFOLD_REPETITION
+        elif self.fifty_moves():
+            return State.FIFTY_MOVES
+        elif self.insufficient_material():
+            return State.INSUFFICIENT_MATERIAL
         elif self.out_of_time():
             return State.OUT_OF_TIME
+        elif self.check():
+            return State.CHECK
         else:
             return
 
-    def update_player_time(self, color: Color):
-        if self.players.get(color).time == 0:
-            return
-
-        self.players.get(color).time -= 1
-
     def print(self):
         """ print out the current board state"""
         print('  ' + '  '.join(LETTERS, ))
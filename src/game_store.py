@@ -0,0 +1,286 @@
+"""
+Stores for the games of the app, by game id. The memory store keeps the games in the process itself, which limits the
+app to a single process. The SQLite store keeps a compact record of each game in a database file, so any number of
+worker processes on the same machine can serve the same games.
+
+The backend is picked with the GAME_STORE environment variable ('memory' or 'sqlite'), the location of the database
+with GAME_STORE_PATH.
+
+The memory store evicts games that haven't been accessed for GAME_TTL seconds, and the least recently used games once
+it holds more than GAME_MAX_GAMES games or its estimated memory use exceeds GAME_MAX_MEMORY MB. If GAME_SPILL_PATH is
+set, evicted games with moves are spilled to an SQLite database there, and restored when they are asked for again.
+The SQLite store deletes the games that haven't changed for GAME_TTL seconds, and the least recently changed games
+beyond GAME_MAX_GAMES, at most once every CLEANUP_INTERVAL seconds per process. Each process keeps the games it read or
+wrote, so a game is only replayed from its record when another process changed it.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from json import dumps, loads
+from os import environ
+from sqlite3 import Connection, connect
+from src.game import Game
+from threading import Lock, local
+from time import monotonic, time
+from typing import Optional
+
+
+class GameStore(ABC):
+    """ keeps the games by their id """
+
+    @abstractmethod
+    def get(self, game_id: str) -> Optional[Game]:
+        """ return the game with given id, or None if there is no such game """
+
+    @abstractmethod
+    def put(self, game_id: str, game: Game):
+        """ store a game, replacing the game with the same id """
+
+    @abstractmethod
+    def delete(self, game_id: str):
+        """ remove a game, if it exists """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """ the number of games in the store """
+
+
+# rough estimates of the memory taken by a game, including its tiles and cached attack map, and by each move made
+GAME_SIZE = 24 * 1024
+MOVE_SIZE = 256
+
+
+class MemoryGameStore(GameStore):
+    """ keeps the game objects in a dictionary in this process, ordered from least to most recently accessed. Games
+    are evicted once they have been idle for longer than the ttl (in seconds), or when the store holds more than the
+    max number of games or exceeds its max memory (in MB), least recently used first. Evicted games that have moves
+    are spilled to another store, if given, and taken back from there when they are asked for again """
+
+    def __init__(
+            self,
+            ttl: Optional[float] = None,
+            max_games: Optional[int] = None,
+            max_memory: Optional[float] = None,
+            spill: Optional[GameStore] = None
+    ):
+        self.games: OrderedDict[str, tuple[Game, float]] = OrderedDict()
+        self.ttl = ttl
+        self.max_games = max_games
+        self.max_memory = max_memory
+        self.spill = spill
+        self.evictions = 0
+        self._lock = Lock()
+
+    def get(self, game_id: str) -> Optional[Game]:
+        with self._lock:
+            if game_id in self.games:
+                game, _ = self.games.pop(game_id)
+                self.games[game_id] = game, monotonic()
+                return game
+
+        if self.spill is None or (game := self.spill.get(game_id)) is None:
+            return None
+
+        self.spill.delete(game_id)
+        self.put(game_id, game)
+        return game
+
+    def put(self, game_id: str, game: Game):
+        with self._lock:
+            self.games.pop(game_id, None)
+            self.games[game_id] = game, monotonic()
+            evicted = self._evict()
+
+        self._spill(evicted)
+
+    def delete(self, game_id: str):
+        with self._lock:
+            self.games.pop(game_id, None)
+
+        if self.spill is not None:
+            self.spill.delete(game_id)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    @property
+    def memory(self) -> float:
+        """ the estimated memory taken by the games in MB """
+        return sum(_size(game) for game, _ in self.games.values()) / (1024 * 1024)
+
+    def _evict(self) -> list[tuple[str, Game]]:
+        """ remove the idle games, then the least recently used games while the store is over its limits. Returns
+        the games removed. Must be called holding the lock """
+        evicted = []
+        if self.ttl is not None:
+            expired = monotonic() - self.ttl
+            while self.games and next(iter(self.games.values()))[1] < expired:
+                game_id, (game, _) = self.games.popitem(last=False)
+                evicted.append((game_id, game))
+
+        max_games = len(self.games) if self.max_games is None else self.max_games
+        max_memory = None if self.max_memory is None else self.max_memory * 1024 * 1024
+        memory = 0 if max_memory is None else self.memory * 1024 * 1024
+        while self.games and (len(self.games) > max_games or max_memory is not None and memory > max_memory):
+            game_id, (game, _) = self.games.popitem(last=False)
+            evicted.append((game_id, game))
+            memory -= _size(game)
+
+        self.evictions += len(evicted)
+        return evicted
+
+    def _spill(self, evicted: list[tuple[str, Game]]):
+        """ move the evicted games that have moves to the spill store """
+        if self.spill is None:
+            return
+
+        for game_id, game in evicted:
+            if game.history:
+                self.spill.put(game_id, game)
+
+
+def _size(game: Game) -> int:
+    """ return the estimated memory taken by a game in bytes """
+    return GAME_SIZE + MOVE_SIZE * len(game.history)
+
+
+# the seconds between two cleanups of the SQLite store by the same process
+CLEANUP_INTERVAL = 60
+
+
+class SQLiteGameStore(GameStore):
+    """ keeps a record of each game, i.e. its starting position, moves and clocks, in an SQLite database. Each thread
+    gets a connection of its own, and the database is in write-ahead logging mode, so readers don't block writers.
+    Games that haven't changed for longer than the ttl (in seconds) are deleted, as are the least recently changed
+    games beyond the max number of games. The store is cleaned up when a game is put, at most once every
+    CLEANUP_INTERVAL seconds, so the limits may be exceeded in between.
+
+    Unless cache is False, the games are also kept in this process along with the time they were last changed, and
+    a game is only replayed from its record if another process changed it since """
+
+    def __init__(
+            self,
+            path: str = 'games.sqlite3',
+            ttl: Optional[float] = None,
+            max_games: Optional[int] = None,
+            cache: bool = True
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_games = max_games
+        self.cache: Optional[dict[str, tuple[float, Game]]] = {} if cache else None
+        self._cache_lock = Lock()
+        self._local = local()
+        # when the store was last cleaned up, by this process
+        self._cleaned: Optional[float] = None
+        self._cleanup_lock = Lock()
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS games (id TEXT PRIMARY KEY, record TEXT NOT NULL, updated REAL NOT NULL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS games_updated ON games (updated)')
+
+    def _connection(self) -> Connection:
+        """ return the connection of the current thread, which is opened on first use """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+
+        return connection
+
+    def get(self, game_id: str) -> Optional[Game]:
+        connection = self._connection()
+        if self.cache is not None:
+            row = connection.execute('SELECT updated FROM games WHERE id = ?', (game_id,)).fetchone()
+            with self._cache_lock:
+                if row is None:
+                    self.cache.pop(game_id, None)
+                    return None
+                if (cached := self.cache.get(game_id)) is not None and cached[0] == row[0]:
+                    return cached[1]
+
+        row = connection.execute('SELECT record, updated FROM games WHERE id = ?', (game_id,)).fetchone()
+        if row is None:
+            return None
+
+        game = Game.from_record(loads(row[0]))
+        self._cache_game(game_id, row[1], game)
+        return game
+
+    def put(self, game_id: str, game: Game):
+        updated = time()
+        self._connection().execute(
+            'INSERT INTO games (id, record, updated) VALUES (?, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET record = excluded.record, updated = excluded.updated',
+            (game_id, dumps(game.to_record(), separators=(',', ':')), updated)
+        )
+        self._cache_game(game_id, updated, game)
+        self._cleanup()
+
+    def delete(self, game_id: str):
+        self._connection().execute('DELETE FROM games WHERE id = ?', (game_id,))
+        if self.cache is not None:
+            with self._cache_lock:
+                self.cache.pop(game_id, None)
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    def _cache_game(self, game_id: str, updated: float, game: Game):
+        """ keep a game in this process, along with the time it was last changed """
+        if self.cache is not None:
+            with self._cache_lock:
+                self.cache[game_id] = updated, game
+
+    def _cleanup(self):
+        """ delete the expired games and the least recently changed games beyond the max number of games, from the
+        database and from the cache of this process, unless the store was cleaned up less than CLEANUP_INTERVAL
+        seconds ago """
+        if self.ttl is None and self.max_games is None:
+            return
+
+        with self._cleanup_lock:
+            if self._cleaned is not None and monotonic() - self._cleaned < CLEANUP_INTERVAL:
+                return
+            self._cleaned = monotonic()
+
+        connection = self._connection()
+        if self.ttl is not None:
+            connection.execute('DELETE FROM games WHERE updated < ?', (time() - self.ttl,))
+        if self.max_games is not None:
+            connection.execute(
+                'DELETE FROM games WHERE id IN (SELECT id FROM games ORDER BY updated DESC LIMIT -1 OFFSET ?)',
+                (self.max_games,)
+            )
+
+        if self.cache is not None:
+            with self._cache_lock:
+                expired = -float('inf') if self.ttl is None else time() - self.ttl
+                cached = sorted(self.cache.items(), key=lambda item: item[1][0], reverse=True)[:self.max_games]
+                self.cache = {game_id: entry for game_id, entry in cached if entry[0] >= expired}
+
+
+GAME_STORES = {'memory': MemoryGameStore, 'sqlite': SQLiteGameStore}
+
+
+def game_store(backend: Optional[str] = None) -> GameStore:
+    """ return a game store of the given backend, which defaults to the GAME_STORE environment variable """
+    backend = backend or environ.get('GAME_STORE', 'memory')
+    if backend not in GAME_STORES:
+        raise ValueError(f'unknown game store: {backend}, choose from {", ".join(GAME_STORES)}')
+
+    ttl = float(environ.get('GAME_TTL', 60 * 60))
+    max_games = int(environ.get('GAME_MAX_GAMES', 1_000))
+    if backend == 'sqlite':
+        return SQLiteGameStore(environ.get('GAME_STORE_PATH', 'games.sqlite3'), ttl=ttl, max_games=max_games)
+
+    return MemoryGameStore(
+        ttl=ttl,
+        max_games=max_games,
+        max_memory=float(environ.get('GAME_MAX_MEMORY', 256)),
+        spill=SQLiteGameStore(path, cache=False) if (path := environ.get('GAME_SPILL_PATH')) else None
+    )
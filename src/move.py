@@ -0,0 +1,127 @@
+"""
+Compact move objects, as produced by the move generator of the game, and the castling rules.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from dataclasses import dataclass
+from enum import Enum, IntFlag
+from src.piece import PieceType, Knight, Bishop, Rook, Queen
+from typing import Optional, Type
+from utils.bitboard import SQUARE_NAMES, bit
+from utils.color import Color
+
+
+class MoveFlag(Enum):
+    """ the kind of move, used to resolve the special moves """
+    QUIET = 'quiet'
+    DOUBLE_PUSH = 'double_push'
+    EN_PASSANT = 'en_passant'
+    CASTLING = 'castling'
+    PROMOTION = 'promotion'
+
+
+@dataclass(frozen=True, slots=True)
+class Move:
+    """ a move of a piece from square 'frm' to square 'to'. Captured is the type of the piece taken by the move, if
+    any, promotion the type of the piece a pawn is promoted to, if any. For castling moves, the frm and to squares
+    are those of the king """
+    frm: int
+    to: int
+    piece: Type[PieceType]
+    flag: MoveFlag = MoveFlag.QUIET
+    captured: Optional[Type[PieceType]] = None
+    promotion: Optional[Type[PieceType]] = None
+
+    def __str__(self):
+        promotion = PROMOTION_SYMBOLS[self.promotion] if self.promotion is not None else ''
+        return f'{SQUARE_NAMES[self.frm]}{SQUARE_NAMES[self.to]}{promotion}'
+
+
+PROMOTION_TYPES = (Queen, Rook, Bishop, Knight)
+PROMOTION_SYMBOLS = {Queen: 'Q', Rook: 'R', Bishop: 'B', Knight: 'N'}
+PROMOTION_CODES = {piece_type: i for i, piece_type in enumerate(PROMOTION_TYPES)}
+
+NO_MOVE = 0
+
+
+def encode_move(move: Move) -> int:
+    """ return the move packed in 16 bits: the from square in bits 0-5, the to square in bits 6-11, a promotion flag
+    in bit 12 and the promotion piece in bits 13-14. Only the null move A8A8 encodes to NO_MOVE """
+    code = move.frm | move.to << 6
+    if move.promotion is not None:
+        code |= 1 << 12 | PROMOTION_CODES[move.promotion] << 13
+
+    return code
+
+
+def decode_move(code: int, moves: list[Move]) -> Optional[Move]:
+    """ return the move from the given (legal) moves that matches the code, or None if there is none """
+    if code == NO_MOVE:
+        return None
+
+    return next((m for m in moves if encode_move(m) == code), None)
+
+
+class CastlingRight(IntFlag):
+    """ the castling rights of both players, which are lost once the king or the rook involved has moved """
+    NONE = 0
+    WHITE_KINGSIDE = 1
+    WHITE_QUEENSIDE = 2
+    BLACK_KINGSIDE = 4
+    BLACK_QUEENSIDE = 8
+
+
+@dataclass(frozen=True)
+class Castling:
+    """ the squares involved in castling. 'empty' must be free of pieces and 'safe' may not be under attack """
+    color: Color
+    king_frm: int
+    king_to: int
+    rook_frm: int
+    rook_to: int
+    empty: int
+    safe: int
+
+
+CASTLINGS = {
+    CastlingRight.WHITE_KINGSIDE: Castling(
+        Color.WHITE, king_frm=60, king_to=62, rook_frm=63, rook_to=61,
+        empty=bit(61) | bit(62), safe=bit(60) | bit(61) | bit(62)
+    ),
+    CastlingRight.WHITE_QUEENSIDE: Castling(
+        Color.WHITE, king_frm=60, king_to=58, rook_frm=56, rook_to=59,
+        empty=bit(57) | bit(58) | bit(59), safe=bit(58) | bit(59) | bit(60)
+    ),
+    CastlingRight.BLACK_KINGSIDE: Castling(
+        Color.BLACK, king_frm=4, king_to=6, rook_frm=7, rook_to=5,
+        empty=bit(5) | bit(6), safe=bit(4) | bit(5) | bit(6)
+    ),
+    CastlingRight.BLACK_QUEENSIDE: Castling(
+        Color.BLACK, king_frm=4, king_to=2, rook_frm=0, rook_to=3,
+        empty=bit(1) | bit(2) | bit(3), safe=bit(2) | bit(3) | bit(4)
+    ),
+}
+
+# the castling rights that are lost once a piece moves from or to a square
+CASTLING_RIGHTS_LOST: dict[int, CastlingRight] = {}
+for _right, _castling in CASTLINGS.items():
+    for _square in (_castling.king_frm, _castling.rook_frm):
+        CASTLING_RIGHTS_LOST[_square] = CASTLING_RIGHTS_LOST.get(_square, CastlingRight.NONE) | _right
+CASTLING_SQUARES = sum(bit(s) for s in CASTLING_RIGHTS_LOST)
+
+PAWN_STEP = {Color.WHITE: -8, Color.BLACK: 8}
+# rows are counted from the top of the board, i.e. row 0 holds rank 8
+PROMOTION_ROW = {Color.WHITE: 0, Color.BLACK: 7}
+PAWN_START_ROW = {Color.WHITE: 6, Color.BLACK: 1}
+
+
+@dataclass(slots=True)
+class Undo:
+    """ a record of everything needed to take back a move, which can't be derived from the move itself """
+    move: Move
+    captured: Optional[PieceType]
+    castling: CastlingRight
+    en_passant: Optional[int]
+    halfmove_clock: int
+    key: int
@@ -0,0 +1,107 @@
+"""
+Perft, i.e. counting the leaf nodes of the move generation tree to a fixed depth. The counts of the reference
+positions are known, which makes perft a correctness check of the move generation and make/unmake, as well as a
+throughput benchmark of the rules engine.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from dataclasses import dataclass
+from src.game import Game
+from time import perf_counter
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class ReferencePosition:
+    """ a position with the known perft node counts, where nodes[d - 1] is the count at depth d """
+    name: str
+    setup: Callable[[], Game]
+    nodes: tuple[int, ...]
+
+
+def _fen(fen: str) -> Callable[[], Game]:
+    """ return a setup function for a position in Forsyth-Edwards Notation """
+    return lambda: Game.from_fen(fen)
+
+
+# the reference positions and their counts as published on the chessprogramming wiki (Perft Results)
+REFERENCE_POSITIONS = [
+    ReferencePosition('start', Game, (20, 400, 8_902, 197_281, 4_865_609)),
+    ReferencePosition(
+        'kiwipete', _fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'),
+        (48, 2_039, 97_862, 4_085_603)
+    ),
+    ReferencePosition(
+        'position3', _fen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'),
+        (14, 191, 2_812, 43_238, 674_624)
+    ),
+    ReferencePosition(
+        'position4', _fen('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1'),
+        (6, 264, 9_467, 422_333)
+    ),
+    ReferencePosition(
+        'position5', _fen('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8'),
+        (44, 1_486, 62_379, 2_103_487)
+    ),
+    ReferencePosition(
+        'position6', _fen('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10'),
+        (46, 2_079, 89_890, 3_894_594)
+    ),
+]
+
+
+@dataclass(frozen=True)
+class PerftResult:
+    position: str
+    depth: int
+    nodes: int
+    seconds: float
+    expected: int | None = None
+
+    @property
+    def nps(self) -> float:
+        """ nodes per second """
+        return self.nodes / self.seconds if self.seconds else 0.
+
+    @property
+    def ok(self) -> bool:
+        """ whether the node count matches the expected count, if known """
+        return self.expected is None or self.nodes == self.expected
+
+
+def perft(game: Game, depth: int) -> int:
+    """ count the leaf nodes of the move generation tree of the game's position up to depth """
+    moves = game.legal_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move in moves:
+        game.make_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+
+    return nodes
+
+
+def divide(game: Game, depth: int) -> dict[str, int]:
+    """ return the perft node count below each legal move of the position, useful to locate a wrong count """
+    counts = {}
+    for move in game.legal_moves():
+        game.make_move(move)
+        counts[str(move)] = perft(game, depth - 1)
+        game.unmake_move()
+
+    return counts
+
+
+def run(position: ReferencePosition, depth: int) -> PerftResult:
+    """ run perft on a reference position and time it """
+    game = position.setup()
+    start = perf_counter()
+    nodes = perft(game, depth)
+    seconds = perf_counter() - start
+    expected = position.nodes[depth - 1] if depth <= len(position.nodes) else None
+
+    return PerftResult(position.name, depth, nodes, seconds, expected)
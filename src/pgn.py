@@ -0,0 +1,262 @@
+"""
+Portable Game Notation (PGN), the text format games are exchanged in, e.g.
+
+    [Event "Casual game"]
+    [White "white"]
+    [Black "black"]
+    [Result "1-0"]
+
+    1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+
+Moves are written in Standard Algebraic Notation (SAN), which names the piece and the square it moves to, with just
+enough of the square it moves from to tell it apart from the other legal moves.
+
+The reader parses the text line by line and yields the games one at a time, so it takes the same memory for a file of
+any size. It skips comments, variations and annotations, and resolves each move against the legal moves of the game
+when it is replayed.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from src.fen import PIECE_LETTERS, START_FEN
+from src.game import Game
+from src.move import Move, MoveFlag, PROMOTION_TYPES
+from src.piece import Pawn
+from src.record import Result, result
+from typing import Iterable, Iterator, Optional, Union
+from utils.color import Color
+
+RESULTS = {
+    Result.UNKNOWN: '*',
+    Result.WHITE_WINS: '1-0',
+    Result.BLACK_WINS: '0-1',
+    Result.DRAW: '1/2-1/2',
+}
+RESULT_TOKENS = {token: r for r, token in RESULTS.items()}
+
+# the tags every game is exported with, in their required order
+SEVEN_TAG_ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+SAN_LETTERS = {piece_type: letter.upper() for piece_type, letter in PIECE_LETTERS.items() if piece_type is not Pawn}
+LETTER_SAN = {letter: piece_type for piece_type, letter in SAN_LETTERS.items()}
+
+_SAN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+_TAG = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*]$')
+_TOKEN = re.compile(r'[{}();]|[^\s{}();]+')
+_MOVE_NUMBER = re.compile(r'^\d+\.+')
+_ANNOTATION = re.compile(r'[+#!?]+$')
+_UNESCAPE = re.compile(r'\\(.)')
+
+FILES = 'abcdefgh'
+LINE_LENGTH = 80
+
+
+def _square_name(square: int) -> str:
+    """ return the name of a square in lowercase, e.g. e4 """
+    return f'{FILES[square % 8]}{8 - square // 8}'
+
+
+def _square(name: str) -> int:
+    """ return the square of a name in lowercase, e.g. 36 for e4 """
+    return (8 - int(name[1])) * 8 + FILES.index(name[0])
+
+
+def _escape(value: str) -> str:
+    """ return a tag value with its backslashes and quotes escaped """
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def san(game: Game, move: Move, moves: Optional[list[Move]] = None) -> str:
+    """ return the Standard Algebraic Notation of a legal move in the current position of a game. The legal moves of
+    the position may be passed in if they are known already """
+    if move.flag is MoveFlag.CASTLING:
+        text = 'O-O' if move.to % 8 == 6 else 'O-O-O'
+    elif move.piece is Pawn:
+        capture = move.captured is not None or move.flag is MoveFlag.EN_PASSANT
+        text = f'{_square_name(move.frm)[0]}x' if capture else ''
+        text += _square_name(move.to)
+        if move.promotion is not None:
+            text += f'={SAN_LETTERS[move.promotion]}'
+    else:
+        moves = game.legal_moves() if moves is None else moves
+        # the other pieces of the same type that can move to the same square
+        rivals = [m.frm for m in moves if m.piece is move.piece and m.to == move.to and m.frm != move.frm]
+        frm = _square_name(move.frm)
+        if not rivals:
+            disambiguation = ''
+        elif all(r % 8 != move.frm % 8 for r in rivals):
+            disambiguation = frm[0]
+        elif all(r // 8 != move.frm // 8 for r in rivals):
+            disambiguation = frm[1]
+        else:
+            disambiguation = frm
+
+        capture = 'x' if move.captured is not None else ''
+        text = f'{SAN_LETTERS[move.piece]}{disambiguation}{capture}{_square_name(move.to)}'
+
+    game.make_move(move)
+    if game.check():
+        text += '#' if not game.legal_moves() else '+'
+    game.unmake_move()
+
+    return text
+
+
+def parse_san(game: Game, text: str, moves: Optional[list[Move]] = None) -> Move:
+    """ return the legal move of the current position of a game written in Standard Algebraic Notation. Check and
+    annotation suffixes are ignored, and castling may be written with zeros. Raises a ValueError if the move can't
+    be parsed, or doesn't match exactly one legal move """
+    moves = game.legal_moves() if moves is None else moves
+    text = _ANNOTATION.sub('', text.strip())
+
+    if text in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        file = 6 if len(text) == 3 else 2
+        candidates = [m for m in moves if m.flag is MoveFlag.CASTLING and m.to % 8 == file]
+    elif (match := _SAN.match(text)) is not None:
+        letter, file, rank, to, promotion = match.groups()
+        piece_type = LETTER_SAN[letter] if letter else Pawn
+        promotion_type = LETTER_SAN[promotion] if promotion else None
+        if promotion_type is not None and (piece_type is not Pawn or promotion_type not in PROMOTION_TYPES):
+            raise ValueError(f'invalid promotion in move: {text}')
+
+        to = _square(to)
+        column = None if file is None else FILES.index(file)
+        row = None if rank is None else 8 - int(rank)
+        candidates = [
+            m for m in moves
+            if m.to == to
+            and m.piece is piece_type
+            and m.promotion is promotion_type
+            and m.flag is not MoveFlag.CASTLING
+            and (column is None or m.frm % 8 == column)
+            and (row is None or m.frm // 8 == row)
+        ]
+    else:
+        raise ValueError(f'could not parse move: {text}')
+
+    if not candidates:
+        raise ValueError(f'illegal move: {text}')
+    if len(candidates) > 1:
+        raise ValueError(f'ambiguous move: {text}')
+
+    return candidates[0]
+
+
+@dataclass
+class PgnGame:
+    """ a game as read from PGN: its tags, its moves in Standard Algebraic Notation and the result token """
+    tags: dict[str, str] = field(default_factory=dict)
+    moves: list[str] = field(default_factory=list)
+    result: str = '*'
+
+    @property
+    def fen(self) -> str:
+        """ the starting position of the game """
+        return self.tags.get('FEN', START_FEN)
+
+    def replay(self) -> Game:
+        """ return the game, by playing the moves from the starting position. Raises a ValueError on a move that
+        isn't legal, naming the move and its number """
+        game = Game.from_fen(self.fen)
+        for text in self.moves:
+            try:
+                move = parse_san(game, text)
+            except ValueError as e:
+                number = f'{game.fullmove_number}{"." if game.turn == Color.WHITE else "..."}'
+                raise ValueError(f'move {number} {text}: {e}') from None
+            game.make_move(move)
+
+        return game
+
+
+def read_games(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """ yield the games from lines of PGN text one at a time. Comments, variations, annotations and move numbers
+    are skipped. The moves are not checked, see PgnGame.replay """
+    game = PgnGame()
+    started = False
+    comment = False
+    variation = 0
+
+    for line in lines:
+        stripped = line.strip()
+        if not comment and stripped.startswith('%'):
+            continue
+
+        if not comment and variation == 0 and stripped.startswith('['):
+            if (match := _TAG.match(stripped)) is not None:
+                # tags after the moves of a game without a result start the next game
+                if game.moves:
+                    yield game
+                    game = PgnGame()
+                name, value = match.groups()
+                game.tags[name] = _UNESCAPE.sub(r'\1', value)
+                started = True
+                continue
+
+        for token in _TOKEN.findall(line):
+            if comment:
+                comment = token != '}'
+            elif token == '{':
+                comment = True
+            elif token == ';':
+                break
+            elif token == '(':
+                variation += 1
+            elif token == ')':
+                variation = max(variation - 1, 0)
+            elif variation or token.startswith('$'):
+                continue
+            elif token in RESULT_TOKENS:
+                game.result = token
+                yield game
+                game = PgnGame()
+                started = False
+            elif text := _MOVE_NUMBER.sub('', token):
+                game.moves.append(text)
+                started = True
+
+    if started:
+        yield game
+
+
+def read_pgn(path: Union[str, Path]) -> Iterator[PgnGame]:
+    """ yield the games from a PGN file one at a time """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        yield from read_games(f)
+
+
+def to_pgn(game: Game, tags: Optional[dict[str, str]] = None) -> str:
+    """ return the game in PGN, with the seven tag roster, filled in with unknowns where not given, and the starting
+    position if it isn't the standard one """
+    token = RESULTS[result(game)]
+    tags = {name: '?' for name in SEVEN_TAG_ROSTER} | (tags or {}) | {'Result': token}
+    if game.start_fen != START_FEN:
+        tags |= {'SetUp': '1', 'FEN': game.start_fen}
+
+    header = '\n'.join(f'[{name} "{_escape(value)}"]' for name, value in tags.items())
+
+    # replay the moves to write each of them in the position it was made in
+    replay = Game.from_fen(game.start_fen)
+    words = []
+    for move in game.moves:
+        if replay.turn == Color.WHITE:
+            words.append(f'{replay.fullmove_number}.')
+        elif not words:
+            words.append(f'{replay.fullmove_number}...')
+        words.append(san(replay, move))
+        replay.make_move(move)
+    words.append(token)
+
+    lines, line = [], ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > LINE_LENGTH:
+            lines.append(line)
+            line = word
+        else:
+            line = f'{line} {word}' if line else word
+    lines.append(line)
+
+    return f'{header}\n\n' + '\n'.join(lines) + '\n'
@@ -2,178 +2,91 @@
 author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-19
 """
-from abc import ABC, abstractmethod
 from enum import Enum
 from typing import TypeVar
-from utils.color import Color, opponent
-from utils.direction import Direction, DIAGONAL_DIRECTIONS, STRAIGHT_DIRECTIONS
-from utils.length import Length
-from utils.vector import get_vector
+from utils.color import Color
 
 
-class Piece(ABC):
-    """ a piece on the board """
+class Piece:
+    """ a piece on the board. Pieces are immutable and interned: there is a single instance per type and color, so
+    creating a piece is a lookup and a board holds references to at most thirteen objects. The rules of movement are
+    implemented by the move generator of the game """
+    __slots__ = ('color', 'symbol')
+    symbols: dict[Color, str] = {}
+    _instances: dict[tuple[type, Color], 'Piece'] = {}
 
-    def __init__(self, color: Color):
-        self.color = color
-        self.has_moved = False
+    def __new__(cls, color: Color):
+        piece = Piece._instances.get((cls, color))
+        if piece is None:
+            piece = super().__new__(cls)
+            object.__setattr__(piece, 'color', color)
+            object.__setattr__(piece, 'symbol', cls.symbols.get(color))
+            Piece._instances[cls, color] = piece
 
-    def __str__(self):
-        return self.symbol.get(self.color)
-
-    def __repr__(self):
-        return f'{self.__class__.__name__}({self.color}, {self.symbol.get(self.color)})'
-
-    @property
-    @abstractmethod
-    def symbol(self) -> dict[Color, str]:
-        """ a property containing the symbology for the piece. used to return the str repr for the piece"""
-
-    @abstractmethod
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        """ this method implements whether movement of Tile frm to Tile to is allowed for the piece"""
-
-
-class Pawn(Piece):
-    def __init__(self, color: Color):
-        super().__init__(color)
-        self.is_passable = False
-
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♟', Color.WHITE: '♙'}
+        return piece
 
-    def is_valid_diagonal_move(self, direction: Direction, length: Length) -> bool:
-        if abs(length.dx) == 1 and abs(length.dy) == 1:
-            if self.color == Color.BLACK and direction in (Direction.SE, Direction.SW) \
-                    or self.color == Color.WHITE and direction in (Direction.NE, Direction.NW):
-                return True
+    def __init__(self, *_, **__):
+        """ the attributes are set once, when the piece is first created """
 
-        return False
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
 
-    def is_valid_orthogonal_move(self, direction: Direction, length: Length) -> bool:
-        if length.size == 1 or (length.size == 2 and not self.has_moved):
-            if self.color == Color.BLACK and direction == Direction.S \
-                    or self.color == Color.WHITE and direction == Direction.N:
-                return True
+    def __reduce__(self):
+        return self.__class__, (self.color,)
 
-        return False
+    def __str__(self):
+        return self.symbol
 
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, length = get_vector(frm, to)
-        # regular move / start move
-        if self.is_valid_orthogonal_move(direction, length) \
-                and isinstance(to.piece, Blank):
-            if length.size == 2:
-                self.is_passable = True
-            return True
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.color}, {self.symbol})'
 
-        # taking another piece
-        if self.is_valid_diagonal_move(direction, length) \
-                and to.piece.color == opponent(self.color):
-            return True
 
-        return False
+class Pawn(Piece):
+    __slots__ = ()
+    symbols = {Color.BLACK: '♟', Color.WHITE: '♙'}
 
 
 PieceType = TypeVar('PieceType', bound=Piece)
 
 
 class Rook(Piece):
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♜', Color.WHITE: '♖'}
-
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, _ = get_vector(frm, to)
-
-        if direction in STRAIGHT_DIRECTIONS \
-                and to.piece.color != self.color:
-            return True
-
-        return False
+    __slots__ = ()
+    symbols = {Color.BLACK: '♜', Color.WHITE: '♖'}
 
 
 class Knight(Piece):
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♞', Color.WHITE: '♘'}
-
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, length = get_vector(frm, to)
-
-        if direction in DIAGONAL_DIRECTIONS \
-                and abs(length.dx) + abs(length.dy) == 3 \
-                and to.piece.color != self.color:
-            return True
-
-        return False
+    __slots__ = ()
+    symbols = {Color.BLACK: '♞', Color.WHITE: '♘'}
 
 
 class Bishop(Piece):
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♝', Color.WHITE: '♗'}
-
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, length = get_vector(frm, to)
-
-        if direction in DIAGONAL_DIRECTIONS \
-                and abs(length.dx) == abs(length.dy) \
-                and to.piece.color != self.color:
-            return True
-
-        return False
+    __slots__ = ()
+    symbols = {Color.BLACK: '♝', Color.WHITE: '♗'}
 
 
 class Queen(Piece):
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♛', Color.WHITE: '♕'}
-
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, length = get_vector(frm, to)
-
-        if ((direction in DIAGONAL_DIRECTIONS and abs(length.dx) == abs(length.dy))
-            or direction in STRAIGHT_DIRECTIONS) \
-                and to.piece.color != self.color:
-            return True
-
-        return False
+    __slots__ = ()
+    symbols = {Color.BLACK: '♛', Color.WHITE: '♕'}
 
 
 class King(Piece):
-    @property
-    def symbol(self):
-        return {Color.BLACK: '♚', Color.WHITE: '♔'}
-
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        direction, length = get_vector(frm, to)
-
-        if ((direction in DIAGONAL_DIRECTIONS and abs(length.dx) == abs(length.dy))
-            or direction in STRAIGHT_DIRECTIONS) \
-                and abs(length.dx) <= 1 and abs(length.dy) <= 1 \
-                and to.piece.color != self.color:
-            return True
-
-        return False
+    __slots__ = ()
+    symbols = {Color.BLACK: '♚', Color.WHITE: '♔'}
 
 
 class Blank(Piece):
     """ A placeholder class for tiles unoccupied by pieces"""
+    __slots__ = ()
+    symbols = {Color.NONE: ''}
 
-    def __init__(self):
-        self.color = Color.NONE
-        super().__init__(self.color)
+    def __new__(cls, color: Color = Color.NONE):
+        return super().__new__(cls, Color.NONE)
 
-    @property
-    def symbol(self):
-        return {Color.NONE: ''}
+    def __reduce__(self):
+        return self.__class__, ()
 
-    def is_valid_move(self, frm: 'Tile', to: 'Tile') -> bool:  # noqa
-        """ never move a blank field"""
-        return False
 
+BLANK = Blank()
 
 PIECE_TYPE_MAPPER = {
     'king': King,
@@ -0,0 +1,173 @@
+"""
+A compact binary format to archive games in. A file starts with a header, the magic bytes CHSR and a version byte,
+followed by the games, each being:
+
+    result      1 byte, see Result
+    fen length  2 bytes, 0 when the game started from the standard starting position
+    fen         the starting position in Forsyth-Edwards Notation, in ASCII
+    move count  2 bytes
+    moves       2 bytes per move, in the 16-bit encoding of src.move.encode_move
+
+All integers are unsigned and little-endian. The writer appends each game with a single write to a file opened in
+append mode, so processes can archive to the same file. The reader maps the file into memory and yields the games one by
+one, without reading the whole file, and raises a ValueError on a game that is cut short.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from mmap import ACCESS_READ, mmap
+from os import O_APPEND, O_WRONLY, close, fchmod, fstat, link, open as open_fd, unlink, write
+from pathlib import Path
+from src.fen import START_FEN
+from src.game import Game
+from src.move import encode_move
+from src.state import DRAWS, State
+from struct import Struct
+from sys import byteorder
+from tempfile import mkstemp
+from typing import Iterator, Union
+from utils.color import Color
+
+MAGIC = b'CHSR'
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+
+_GAME_HEADER = Struct('<BH')
+_MOVE_COUNT = Struct('<H')
+
+
+class Result(IntEnum):
+    """ the result of an archived game """
+    UNKNOWN = 0
+    WHITE_WINS = 1
+    BLACK_WINS = 2
+    DRAW = 3
+
+
+@dataclass(frozen=True)
+class GameRecord:
+    """ an archived game: the starting position, the encoded moves and the result """
+    fen: str
+    moves: array
+    result: Result
+
+    def replay(self) -> Game:
+        """ return the game, by replaying the moves from the starting position """
+        return Game.from_moves(self.moves, fen=self.fen)
+
+
+def result(game: Game) -> Result:
+    """ return the result of a game, as far as it is decided """
+    state = game.state()
+    if state in DRAWS:
+        return Result.DRAW
+    if state in (State.CHECKMATE, State.OUT_OF_TIME):
+        return Result.BLACK_WINS if game.turn == Color.WHITE else Result.WHITE_WINS
+
+    return Result.UNKNOWN
+
+
+def dumps(game: Game) -> bytes:
+    """ return the binary record of a game """
+    fen = b'' if game.start_fen == START_FEN else game.start_fen.encode('ascii')
+    moves = array('H', [encode_move(m) for m in game.moves])
+    if byteorder == 'big':
+        moves.byteswap()
+
+    return _GAME_HEADER.pack(result(game), len(fen)) + fen + _MOVE_COUNT.pack(len(moves)) + moves.tobytes()
+
+
+class RecordWriter:
+    """ appends games to a record file, creating it with the header if it doesn't exist """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        if not self.path.exists():
+            self._create()
+        self._fd = open_fd(self.path, O_WRONLY | O_APPEND)
+
+    def _create(self):
+        """ create the file with just the header. Several processes may create the same file at once, so the header
+        is written to a temporary file first, which is then linked to the path only if no other process did so
+        first. That way the file never exists without the header, nor with more than one """
+        fd, temporary = mkstemp(prefix=f'.{self.path.name}.', dir=self.path.parent)
+        try:
+            fchmod(fd, 0o644)
+            write(fd, HEADER)
+        finally:
+            close(fd)
+
+        try:
+            link(temporary, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            unlink(temporary)
+
+    def write(self, game: Game):
+        """ append a game to the file. A write may be cut short, e.g. by a signal, so the rest is written until the
+        whole game is """
+        data = memoryview(dumps(game))
+        while data:
+            data = data[write(self._fd, data):]
+
+    def close(self):
+        if self._fd is not None:
+            close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def _check_length(data: mmap, start: int, end: int):
+    """ raise a ValueError if the game starting at the offset start would end beyond the data, i.e. the file is
+    truncated, or still being written to """
+    if end > len(data):
+        raise ValueError(f'truncated game at offset {start}: needs {end - start} bytes, {len(data) - start} left')
+
+
+class RecordReader:
+    """ iterates the games in a record file, which is memory-mapped rather than read """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        with open(self.path, 'rb') as f:
+            if fstat(f.fileno()).st_size == 0:
+                return
+
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+                if data[:len(HEADER)] != HEADER:
+                    raise ValueError(f'{self.path} is not a game record file of version {VERSION}')
+
+                offset = len(HEADER)
+                while offset < len(data):
+                    start = offset
+                    _check_length(data, start, offset + _GAME_HEADER.size)
+                    game_result, fen_length = _GAME_HEADER.unpack_from(data, offset)
+                    offset += _GAME_HEADER.size
+                    _check_length(data, start, offset + fen_length + _MOVE_COUNT.size)
+                    fen = data[offset:offset + fen_length].decode('ascii') if fen_length else START_FEN
+                    offset += fen_length
+                    (move_count,) = _MOVE_COUNT.unpack_from(data, offset)
+                    offset += _MOVE_COUNT.size
+                    _check_length(data, start, offset + 2 * move_count)
+                    moves = array('H', data[offset:offset + 2 * move_count])
+                    if byteorder == 'big':
+                        moves.byteswap()
+                    offset += 2 * move_count
+
+                    yield GameRecord(fen, moves, Result(game_result))
+
+    def games(self) -> Iterator[Game]:
+        """ yield the games, replayed """
+        for record in self:
+            yield record.replay()
@@ -10,4 +10,13 @@ class State(Enum):
     CHECK = 'check'
     CHECKMATE = 'checkmate'
     STALEMATE = 'stalemate'
+    THREEFOLD_REPETITION = 'threefold_repetition'
+    FIFTY_MOVES = 'fifty_moves'
+    INSUFFICIENT_MATERIAL = 'insufficient_material'
     OUT_OF_TIME = 'out_of_time'
+
+
+# the states in which the game is drawn
+DRAWS = frozenset({State.STALEMATE, State.THREEFOLD_REPETITION, State.FIFTY_MOVES, State.INSUFFICIENT_MATERIAL})
+# the states in which the game is over
+GAME_OVER = DRAWS | {State.CHECKMATE, State.OUT_OF_TIME}
@@ -3,19 +3,19 @@ author: David den Uyl (djdenuyl@gmail.com)
 date: 2022-10-19
 """
 from dataclasses import dataclass, field
-from src.piece import Blank, PieceType
+from src.piece import BLANK, PieceType
 from typing import Type
 from utils.letters import LETTERS
 
 
-@dataclass
+@dataclass(slots=True)
 class Tile:
     x: str = field(repr=False)
     y: int = field(repr=False)
     x_int: int = field(init=False, repr=False)
     name: str = field(init=False)
     color: str = field(init=False)
-    piece: Type[PieceType] = Blank()
+    piece: Type[PieceType] = BLANK
 
     def __set_x_int(self):
         self.x_int = LETTERS.index(self.x)
@@ -0,0 +1,140 @@
+"""
+A transposition table: a fixed size hash table of search results keyed by the zobrist key of the position. Entries
+are packed in two flat arrays of unsigned 64-bit integers, one with the keys and one with the data, so the memory
+taken is exactly 16 bytes per entry regardless of what is stored.
+
+The entries are grouped in buckets of two. The first slot of a bucket is depth-preferred: it is only replaced by a
+result of at least the same depth, or of the same position. The second slot is always replaced, and takes whatever
+doesn't fit the first.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+ENTRY_SIZE = 16
+BUCKET_SIZE = 2
+
+# the layout of the data word: move (16 bits), bound (2 bits), depth (8 bits), score (32 bits)
+_BOUND_SHIFT = 16
+_DEPTH_SHIFT = 18
+_SCORE_SHIFT = 26
+_SCORE_OFFSET = 1 << 31
+_MAX_DEPTH = 0xFF
+
+
+class Bound(IntEnum):
+    """ how the stored score relates to the true score of the position. Zero is reserved for an empty slot """
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+
+@dataclass(frozen=True, slots=True)
+class Entry:
+    """ a search result of a position: the score found searching to depth, its bound and the best (encoded) move """
+    depth: int
+    score: int
+    bound: Bound
+    move: int
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16):
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (ENTRY_SIZE * BUCKET_SIZE))
+        self._keys = array('Q', bytes(8 * BUCKET_SIZE * self.buckets))
+        self._data = array('Q', bytes(8 * BUCKET_SIZE * self.buckets))
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def __len__(self) -> int:
+        """ the number of entries the table can hold """
+        return len(self._keys)
+
+    @property
+    def size(self) -> int:
+        """ the memory taken by the entries in bytes """
+        return len(self) * ENTRY_SIZE
+
+    @property
+    def hit_rate(self) -> float:
+        """ the share of probes that found the position """
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """ return the entry of the position with given key, or None if it isn't in the table """
+        i = (key % self.buckets) * BUCKET_SIZE
+        keys, data = self._keys, self._data
+        for slot in (i, i + 1):
+            if keys[slot] == key and data[slot]:
+                self.hits += 1
+                return self._unpack(data[slot])
+
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: Bound, move: int):
+        """ store a search result. A collision is counted when the result evicts that of another position """
+        i = (key % self.buckets) * BUCKET_SIZE
+        keys, data = self._keys, self._data
+        word = self._pack(depth, score, bound, move)
+
+        if keys[i] == key or not data[i] or depth >= (data[i] >> _DEPTH_SHIFT) & _MAX_DEPTH:
+            if keys[i] == key:
+                # keep the best move of an earlier search if this one didn't find any
+                if not move:
+                    word |= data[i] & 0xFFFF
+            else:
+                # drop an older result of this position, and move the replaced result of another position to the
+                # always-replace slot
+                if keys[i + 1] == key:
+                    data[i + 1] = 0
+                if data[i]:
+                    self._replace(i + 1, keys[i], data[i])
+            keys[i], data[i] = key, word
+        else:
+            if keys[i + 1] == key and not move:
+                word |= data[i + 1] & 0xFFFF
+            self._replace(i + 1, key, word)
+
+    def _replace(self, slot: int, key: int, word: int):
+        """ overwrite a slot, counting a collision if it held another position """
+        if self._data[slot] and self._keys[slot] != key:
+            self.collisions += 1
+        self._keys[slot], self._data[slot] = key, word
+
+    def clear(self):
+        """ empty the table and reset the counters """
+        self._keys = array('Q', bytes(8 * len(self)))
+        self._data = array('Q', bytes(8 * len(self)))
+        self.hits = self.misses = self.collisions = 0
+
+    def usage(self) -> float:
+        """ the share of the slots in use, sampled over the first thousand slots """
+        sample = self._data[:1000]
+        return sum(1 for d in sample if d) / len(sample)
+
+    @staticmethod
+    def _pack(depth: int, score: int, bound: Bound, move: int) -> int:
+        """ pack a result in a single 64-bit word """
+        return (
+            move
+            | bound << _BOUND_SHIFT
+            | min(max(depth, 0), _MAX_DEPTH) << _DEPTH_SHIFT
+            | (score + _SCORE_OFFSET) << _SCORE_SHIFT
+        )
+
+    @staticmethod
+    def _unpack(word: int) -> Entry:
+        """ unpack a result from a 64-bit word """
+        return Entry(
+            depth=(word >> _DEPTH_SHIFT) & _MAX_DEPTH,
+            score=(word >> _SCORE_SHIFT) - _SCORE_OFFSET,
+            bound=Bound((word >> _BOUND_SHIFT) & 0b11),
+            move=word & 0xFFFF
+        )
@@ -0,0 +1,95 @@
+"""
+Bulk validation of game collections against the rules engine. Every game of a PGN or game record file is replayed
+move by move through Game, which rejects the first move that isn't legal, and the state of the final position is
+reported. The games are read one at a time and handed out in chunks to a pool of worker processes; the results come
+back in the order of the file.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from src.pgn import PgnGame, read_pgn
+from src.record import MAGIC, GameRecord, RecordReader
+from src.state import State
+from typing import Iterable, Iterator, Optional, Union
+
+CHUNK_SIZE = 64
+
+AnyGame = Union[PgnGame, GameRecord]
+
+
+@dataclass(frozen=True)
+class Validation:
+    """ the outcome of replaying a game: its index in the file, the number of moves (plies) played, the state of the
+    final position, and the error on the first illegal move, if any """
+    index: int
+    plies: int
+    state: Optional[State]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def read_games(path: Union[str, Path]) -> Iterator[AnyGame]:
+    """ yield the games of a file one at a time, which is either a game record file, recognised by its magic bytes,
+    or PGN """
+    with open(path, 'rb') as f:
+        is_record = f.read(len(MAGIC)) == MAGIC
+
+    return iter(RecordReader(path)) if is_record else read_pgn(path)
+
+
+def validate_game(index: int, game: AnyGame) -> Validation:
+    """ replay a game and return the outcome """
+    try:
+        replayed = game.replay()
+    except ValueError as e:
+        return Validation(index, 0, None, str(e))
+
+    return Validation(index, len(replayed.history), replayed.state())
+
+
+def validate_chunk(start: int, games: list[AnyGame]) -> list[Validation]:
+    """ replay a chunk of consecutive games, the first of which has index start """
+    return [validate_game(start + i, game) for i, game in enumerate(games)]
+
+
+def _chunks(games: Iterable[AnyGame], size: int) -> Iterator[tuple[int, list[AnyGame]]]:
+    """ yield the index of the first game and the games of consecutive chunks of given size """
+    chunk, start = [], 0
+    for game in games:
+        chunk.append(game)
+        if len(chunk) == size:
+            yield start, chunk
+            start += size
+            chunk = []
+
+    if chunk:
+        yield start, chunk
+
+
+def validate(games: Iterable[AnyGame], workers: int = 1, chunk_size: int = CHUNK_SIZE) -> Iterator[Validation]:
+    """ yield the outcome of replaying each game, in order. With more than one worker the chunks are replayed in a
+    pool of processes, with at most two chunks per worker in flight, so the games are read only as fast as they are
+    replayed """
+    chunks = _chunks(games, chunk_size)
+    if workers <= 1:
+        for start, chunk in chunks:
+            yield from validate_chunk(start, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        pending = deque()
+        for start, chunk in chunks:
+            pending.append(pool.submit(validate_chunk, start, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,49 @@
+"""
+Zobrist hashing of positions. Every aspect of a position, i.e. a piece of some color on some square, the player to
+move, the castling rights and the file on which en passant is possible, is assigned a random 64-bit key. The key of a
+position is the xor of the keys of all its aspects, so it can be updated incrementally when a move is made.
+
+The keys are generated from a fixed seed, so they are the same in every process.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from random import Random
+from src.piece import PieceType, Pawn, Knight, Bishop, Rook, Queen, King
+from typing import Optional, Type
+from utils.bitboard import squares
+from utils.color import Color
+
+_random = Random(20221019)
+
+PIECE_KEYS: dict[Color, dict[Type[PieceType], list[int]]] = {
+    color: {
+        piece_type: [_random.getrandbits(64) for _ in range(64)]
+        for piece_type in (Pawn, Knight, Bishop, Rook, Queen, King)
+    } for color in Color.members()
+}
+SIDE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+
+
+def state_key(turn: Color, castling: int, en_passant: Optional[int]) -> int:
+    """ return the key of the player to move, the castling rights and the en passant square """
+    key = CASTLING_KEYS[castling]
+    if turn == Color.BLACK:
+        key ^= SIDE_KEY
+    if en_passant is not None:
+        key ^= EN_PASSANT_KEYS[en_passant % 8]
+
+    return key
+
+
+def placement_key(pieces: dict[Type[PieceType], int], colors: dict[Color, int]) -> int:
+    """ return the key of the placement of the pieces, given the bitboards of a board """
+    key = 0
+    for color, color_mask in colors.items():
+        for piece_type, piece_mask in pieces.items():
+            for square in squares(piece_mask & color_mask):
+                key ^= PIECE_KEYS[color][piece_type][square]
+
+    return key
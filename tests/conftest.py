@@ -0,0 +1,38 @@
+"""
+Fixtures shared by the tests
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from random import Random
+from src.fen import START_FEN
+from src.game import Game
+from src.perft import REFERENCE_POSITIONS
+from src.pgn import parse_san
+
+
+def play(game: Game, moves: str) -> Game:
+    """ play moves in Standard Algebraic Notation, separated by spaces, and return the game """
+    for text in moves.split():
+        game.make_move(parse_san(game, text))
+
+    return game
+
+
+@pytest.fixture(scope='session')
+def random_games() -> list[Game]:
+    """ games of random legal moves from the reference positions, the same in every run """
+    rng = Random(2026)
+    games = []
+    for i in range(60):
+        fen = START_FEN if i % 2 == 0 else REFERENCE_POSITIONS[i % len(REFERENCE_POSITIONS)].setup().to_fen()
+        game = Game.from_fen(fen)
+        for _ in range(rng.randint(0, 120)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.make_move(rng.choice(moves))
+        games.append(game)
+
+    return games
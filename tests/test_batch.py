@@ -0,0 +1,44 @@
+"""
+Batch analysis of positions with NumPy, against the rules engine
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import numpy as np
+from src.batch import analyse, analyse_fens, encode, encode_fens
+from src.evaluation import evaluate
+
+
+def test_analyse_fens_matches_game(random_games):
+    result = analyse_fens(game.to_fen() for game in random_games)
+
+    assert len(result) == len(random_games)
+    assert result.legal.all()
+    assert result.check.tolist() == [game.check() for game in random_games]
+    assert result.checkmate.tolist() == [game.checkmate() for game in random_games]
+    assert result.evaluation.tolist() == [evaluate(game.board, game.turn) for game in random_games]
+
+
+def test_encode_fens_matches_encode(random_games):
+    boards, _ = encode_fens(game.to_fen() for game in random_games)
+
+    assert (boards == np.array([encode(game) for game in random_games])).all()
+
+
+def test_illegal_when_the_player_who_just_moved_is_in_check():
+    # black to move, while the white king is attacked by the black rook
+    result = analyse_fens(['4k3/8/8/8/8/8/8/r3K3 b - - 0 1', '4k3/8/8/8/8/8/8/r3K3 w - - 0 1'])
+
+    assert result.legal.tolist() == [False, True]
+    assert result.check.tolist() == [False, True]
+    assert result.evaluation[0] == 0
+
+
+def test_empty_batch():
+    boards, turns = encode_fens([])
+    assert boards.shape == (0, 64)
+    assert turns.shape == (0,)
+
+    result = analyse(boards, turns)
+    assert len(result) == 0
+    assert result.evaluation.shape == (0,)
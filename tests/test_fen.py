@@ -0,0 +1,46 @@
+"""
+Forsyth-Edwards Notation of positions
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from src.fen import START_FEN
+from src.game import Game
+from src.perft import REFERENCE_POSITIONS
+
+
+def test_start_position():
+    assert Game().to_fen() == START_FEN
+
+
+@pytest.mark.parametrize('position', REFERENCE_POSITIONS, ids=lambda p: p.name)
+def test_reference_positions_round_trip(position):
+    fen = position.setup().to_fen()
+    assert Game.from_fen(fen).to_fen() == fen
+
+
+def test_random_positions_round_trip(random_games):
+    for game in random_games:
+        restored = Game.from_fen(game.to_fen())
+
+        assert restored.to_fen() == game.to_fen()
+        assert restored.key == game.key
+        assert restored.legal_moves() == game.legal_moves()
+
+
+def test_clocks_may_be_left_out():
+    assert Game.from_fen('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -').to_fen() == START_FEN
+
+
+@pytest.mark.parametrize('fen', [
+    '',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1',
+    'rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+])
+def test_invalid_fen(fen):
+    with pytest.raises(ValueError):
+        Game.from_fen(fen)
@@ -0,0 +1,119 @@
+"""
+Making and taking back moves, and the state of the game
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from conftest import play
+from src.game import Game
+from src.record import Result, result
+from src.state import DRAWS, State
+
+
+def test_incremental_key_matches_computed_key(random_games):
+    for game in random_games:
+        replay = Game.from_fen(game.start_fen)
+        for move in game.moves:
+            replay.make_move(move)
+            assert replay.key == replay.compute_key()
+
+
+def test_unmake_restores_position(random_games):
+    for game in random_games:
+        positions = []
+        replay = Game.from_fen(game.start_fen)
+        for move in game.moves:
+            positions.append((replay.to_fen(), replay.key))
+            replay.make_move(move)
+
+        for fen, key in reversed(positions):
+            replay.unmake_move()
+            assert (replay.to_fen(), replay.key) == (fen, key)
+
+
+def test_unmake_restores_repetitions(random_games):
+    for game in random_games:
+        replay = Game.from_fen(game.start_fen)
+        counts = []
+        for move in game.moves:
+            counts.append(dict(replay._repetitions))
+            replay.make_move(move)
+
+        for count in reversed(counts):
+            replay.unmake_move()
+            assert replay._repetitions == count
+
+
+def test_threefold_repetition():
+    game = play(Game(), 'Nf3 Nf6 Ng1 Ng8 Nf3 Nf6 Ng1')
+    assert game.repetitions == 2
+    assert game.state() is None
+
+    play(game, 'Ng8')
+    assert game.repetitions == 3
+    assert game.state() == State.THREEFOLD_REPETITION
+
+    game.unmake_move()
+    assert game.state() is None
+
+
+def test_repetition_needs_the_same_player_to_move():
+    game = play(Game(), 'Nf3 Nf6 Ng1 Ng8')
+    assert game.repetitions == 2
+
+    play(game, 'Nf3')
+    assert game.repetitions == 2
+
+
+def test_fifty_moves():
+    game = Game.from_fen('k7/8/8/8/8/8/8/R6K w - - 99 80')
+    assert game.state() is None
+
+    play(game, 'Rb1')
+    assert game.state() == State.FIFTY_MOVES
+
+
+def test_pawn_move_resets_fifty_moves():
+    game = play(Game.from_fen('k7/8/8/8/8/8/P7/R6K w - - 99 80'), 'a3')
+    assert game.halfmove_clock == 0
+    assert game.state() is None
+
+
+def test_checkmate_ends_fifty_moves():
+    game = play(Game.from_fen('k7/8/1K6/8/8/8/8/7R w - - 99 80'), 'Rh8')
+    assert game.state() == State.CHECKMATE
+
+
+def test_out_of_time_while_in_check():
+    game = Game.from_fen('4k3/8/8/8/8/8/4q3/4K3 w - - 0 1', time=0)
+    assert game.check()
+    assert game.state() == State.OUT_OF_TIME
+
+
+def test_stalemate():
+    assert Game.from_fen('k7/8/1Q6/8/8/8/8/7K b - - 0 1').state() == State.STALEMATE
+
+
+@pytest.mark.parametrize('fen, insufficient', [
+    ('8/8/8/8/8/8/8/K1k5 w - - 0 1', True),
+    ('8/8/8/8/8/8/8/KN1k4 w - - 0 1', True),
+    ('8/8/8/8/8/8/8/KB1k4 w - - 0 1', True),
+    # b1 and f1 are both light squares, e1 is a dark one
+    ('8/8/8/8/8/8/8/KB1k1b2 w - - 0 1', True),
+    ('8/8/8/8/8/8/8/KB1kb3 w - - 0 1', False),
+    ('8/8/8/8/8/8/8/KN1kn3 w - - 0 1', False),
+    ('8/8/8/8/8/8/8/KNNk4 w - - 0 1', False),
+    ('8/8/8/8/8/8/P7/K1k5 w - - 0 1', False),
+    ('8/8/8/8/8/8/8/KR1k4 w - - 0 1', False),
+])
+def test_insufficient_material(fen, insufficient):
+    game = Game.from_fen(fen)
+    assert game.insufficient_material() == insufficient
+    assert (game.state() == State.INSUFFICIENT_MATERIAL) == insufficient
+
+
+def test_draws_are_recorded_as_draws():
+    game = play(Game(), 'Nf3 Nf6 Ng1 Ng8 Nf3 Nf6 Ng1 Ng8')
+    assert game.state() in DRAWS
+    assert result(game) == Result.DRAW
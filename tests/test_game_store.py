@@ -0,0 +1,97 @@
+"""
+The game stores of the app
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from conftest import play
+from src.game import Game
+from src.game_store import MemoryGameStore, SQLiteGameStore
+
+
+@pytest.fixture
+def sqlite_store(tmp_path) -> SQLiteGameStore:
+    return SQLiteGameStore(str(tmp_path / 'games.sqlite3'))
+
+
+def test_sqlite_round_trip(sqlite_store):
+    game = play(Game(), 'e4 e5 Nf3')
+    sqlite_store.put('a', game)
+
+    restored = sqlite_store.get('a')
+    assert restored.moves == game.moves
+    assert restored.to_fen() == game.to_fen()
+    assert sqlite_store.get('b') is None
+
+    sqlite_store.delete('a')
+    assert sqlite_store.get('a') is None
+
+
+def test_sqlite_store_replays_games_changed_by_another_process(tmp_path):
+    path = str(tmp_path / 'games.sqlite3')
+    store, other = SQLiteGameStore(path), SQLiteGameStore(path)
+    game = play(Game(), 'e4 e5')
+    store.put('a', game)
+    assert store.get('a') is game
+
+    restored = other.get('a')
+    assert restored is not game
+    assert restored.moves == game.moves
+    assert other.get('a') is restored
+
+    game.make_move(game.legal_moves()[0])
+    store.put('a', game)
+    assert other.get('a').moves == game.moves
+
+    store.delete('a')
+    assert other.get('a') is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryGameStore(max_games=2)
+    store.put('a', Game())
+    store.put('b', Game())
+    store.get('a')
+    store.put('c', Game())
+
+    assert store.get('b') is None
+    assert store.get('a') is not None
+    assert store.evictions == 1
+
+
+def test_memory_store_evicts_idle_games():
+    store = MemoryGameStore(ttl=0)
+    store.put('a', Game())
+    store.put('b', Game())
+
+    assert store.get('a') is None
+
+
+def test_memory_store_restores_spilled_games(sqlite_store):
+    store = MemoryGameStore(max_games=1, spill=sqlite_store)
+    game = play(Game(), 'd4')
+    store.put('a', game)
+    store.put('b', Game())
+
+    assert len(store) == 1
+    assert store.get('a').moves == game.moves
+    assert sqlite_store.get('a') is None
+
+
+def test_sqlite_store_deletes_expired_games(tmp_path):
+    store = SQLiteGameStore(str(tmp_path / 'games.sqlite3'), ttl=-1)
+    store.put('a', Game())
+
+    assert len(store) == 0
+
+
+def test_sqlite_store_keeps_the_most_recent_games(tmp_path):
+    store = SQLiteGameStore(str(tmp_path / 'games.sqlite3'), max_games=2)
+    for game_id in 'abcd':
+        store.put(game_id, Game())
+        store._cleaned = None
+
+    assert len(store) == 2
+    assert store.get('a') is None
+    assert store.get('d') is not None
@@ -0,0 +1,26 @@
+"""
+Perft of the reference positions, the correctness check of the move generation and make/unmake
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from src.perft import REFERENCE_POSITIONS, perft
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3])
+@pytest.mark.parametrize('position', REFERENCE_POSITIONS, ids=lambda p: p.name)
+def test_perft(position, depth):
+    assert perft(position.setup(), depth) == position.nodes[depth - 1]
+
+
+@pytest.mark.parametrize('position', REFERENCE_POSITIONS, ids=lambda p: p.name)
+def test_perft_restores_position(position):
+    """ perft makes and takes back every move, which leaves the game as it was """
+    game = position.setup()
+    fen, key = game.to_fen(), game.key
+    perft(game, 2)
+
+    assert game.to_fen() == fen
+    assert game.key == key
+    assert not game.history
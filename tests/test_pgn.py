@@ -0,0 +1,79 @@
+"""
+Portable Game Notation and Standard Algebraic Notation
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from io import StringIO
+from src.game import Game
+from src.pgn import parse_san, read_games, read_pgn, san, to_pgn
+
+
+def test_san_round_trip(random_games):
+    for game in random_games:
+        replay = Game.from_fen(game.start_fen)
+        for move in game.moves:
+            assert parse_san(replay, san(replay, move)) == move
+            replay.make_move(move)
+
+
+def test_pgn_round_trip(random_games, tmp_path):
+    path = tmp_path / 'games.pgn'
+    path.write_text('\n'.join(to_pgn(game, {'Event': f'game {i}'}) for i, game in enumerate(random_games)))
+
+    read = list(read_pgn(path))
+    assert len(read) == len(random_games)
+    for i, (game, pgn_game) in enumerate(zip(random_games, read)):
+        assert pgn_game.tags['Event'] == f'game {i}'
+        replay = pgn_game.replay()
+        assert replay.start_fen == game.start_fen
+        assert replay.moves == game.moves
+
+
+@pytest.mark.parametrize('fen, move, text', [
+    ('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3', 'f1b5', 'Bb5'),
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'e1g1', 'O-O'),
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'e1c1', 'O-O-O'),
+    ('4k3/8/8/8/8/8/4K3/R6R w - - 0 1', 'a1d1', 'Rad1'),
+    ('4k3/8/8/8/R7/8/8/R3K3 w Q - 0 1', 'a1a2', 'R1a2'),
+    ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'e5d6', 'exd6'),
+    ('7k/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8q', 'b8=Q+'),
+    ('rnbqkbnr/ppppp2p/5p2/6p1/4P3/3P4/PPP2PPP/RNBQKBNR w KQkq - 0 3', 'd1h5', 'Qh5#'),
+])
+def test_san(fen, move, text):
+    game = Game.from_fen(fen)
+    [move] = [m for m in game.legal_moves() if str(m).lower() == move]
+    assert san(game, move) == text
+    assert parse_san(game, text) == move
+
+
+@pytest.mark.parametrize('text', ['Ke2', 'Nd2', 'e5', 'Z9', 'O-O', 'e8=K'])
+def test_parse_invalid_san(text):
+    with pytest.raises(ValueError):
+        parse_san(Game(), text)
+
+
+def test_read_skips_comments_variations_and_annotations():
+    text = '''[Event "a \\"quoted\\" name"]
+% an escaped line
+1. e4 {a comment
+spanning (lines) 1-0} e5 $1 2. Nf3!? (2. f4 exf4 (2... d5)) Nc6 ; the rest of the line 1-0
+3.Bb5 a6 *
+
+[Event "next"]
+1. d4 d5 1/2-1/2
+'''
+    first, second = read_games(StringIO(text))
+
+    assert first.tags['Event'] == 'a "quoted" name'
+    assert first.moves == ['e4', 'e5', 'Nf3!?', 'Nc6', 'Bb5', 'a6']
+    assert first.result == '*'
+    assert second.moves == ['d4', 'd5']
+    assert second.result == '1/2-1/2'
+
+
+def test_replay_names_the_illegal_move():
+    [game] = read_games(StringIO('1. e4 e5 2. Ke3 *'))
+    with pytest.raises(ValueError, match=r'move 2\. Ke3'):
+        game.replay()
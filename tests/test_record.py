@@ -0,0 +1,79 @@
+"""
+The binary game record format
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from conftest import play
+from src.game import Game
+from src.record import HEADER, RecordReader, RecordWriter, Result, result
+
+
+def test_record_round_trip(random_games, tmp_path):
+    path = tmp_path / 'games.rec'
+    with RecordWriter(path) as writer:
+        for game in random_games:
+            writer.write(game)
+
+    records = list(RecordReader(path))
+    assert len(records) == len(random_games)
+    for game, record in zip(random_games, records):
+        assert record.fen == game.start_fen
+        assert record.result == result(game)
+        assert record.replay().moves == game.moves
+
+
+def test_writers_append_to_one_header(tmp_path):
+    path = tmp_path / 'games.rec'
+    for _ in range(3):
+        with RecordWriter(path) as writer:
+            writer.write(Game())
+
+    assert path.read_bytes().count(HEADER) == 1
+    assert len(list(RecordReader(path))) == 3
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'games.rec'
+    path.touch()
+    assert list(RecordReader(path)) == []
+
+
+# a game of four moves takes 13 bytes: 3 for the result and the fen length, 2 for the move count and 8 for the moves
+@pytest.mark.parametrize('cut', [2, 12], ids=['moves', 'header'])
+def test_truncated_file(tmp_path, cut):
+    """ cutting the last game short, in its moves or in its header, must not yield a shorter game """
+    game = play(Game(), 'e4 e5 Nf3 Nc6')
+    path = tmp_path / 'games.rec'
+    with RecordWriter(path) as writer:
+        writer.write(game)
+        writer.write(game)
+    path.write_bytes(path.read_bytes()[:-cut])
+
+    games = iter(RecordReader(path))
+    assert len(next(games).moves) == 4
+    with pytest.raises(ValueError, match='truncated game at offset'):
+        next(games)
+
+
+def test_not_a_record_file(tmp_path):
+    path = tmp_path / 'games.pgn'
+    path.write_text('1. e4 e5 *')
+    with pytest.raises(ValueError):
+        list(RecordReader(path))
+
+
+@pytest.mark.parametrize('fen, expected', [
+    ('k7/1Q6/1K6/8/8/8/8/8 b - - 0 1', Result.WHITE_WINS),
+    ('k7/8/1Q6/8/8/8/8/7K b - - 0 1', Result.DRAW),
+    ('8/8/8/8/8/8/8/K1k5 w - - 0 1', Result.DRAW),
+    ('4k3/8/8/8/8/8/4q3/4K3 w - - 0 1', Result.UNKNOWN),
+])
+def test_result(fen, expected):
+    assert result(Game.from_fen(fen)) == expected
+
+
+def test_loss_on_time_while_in_check():
+    game = Game.from_fen('4k3/8/8/8/8/8/4q3/4K3 w - - 0 1', time=0)
+    assert result(game) == Result.BLACK_WINS
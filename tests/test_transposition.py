@@ -0,0 +1,84 @@
+"""
+The transposition table
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+import pytest
+from src.engine import MATE
+from src.transposition import Bound, Entry, TranspositionTable
+
+
+@pytest.fixture
+def table() -> TranspositionTable:
+    """ a table of a single bucket, so every position falls in the same bucket """
+    table = TranspositionTable(size_mb=0)
+    assert table.buckets == 1
+    return table
+
+
+@pytest.mark.parametrize('depth, score, bound, move', [
+    (0, 0, Bound.EXACT, 0),
+    (7, -350, Bound.UPPER, 0xFFFF),
+    (12, MATE - 3, Bound.LOWER, 1234),
+    (1, -MATE + 2, Bound.EXACT, 4321),
+])
+def test_pack_round_trip(depth, score, bound, move):
+    word = TranspositionTable._pack(depth, score, bound, move)
+    assert word < 1 << 64
+    assert TranspositionTable._unpack(word) == Entry(depth, score, bound, move)
+
+
+def test_pack_clamps_the_depth():
+    assert TranspositionTable._unpack(TranspositionTable._pack(300, 5, Bound.EXACT, 1)).depth == 255
+
+
+def test_shallower_result_goes_to_the_always_replace_slot(table):
+    table.store(1, 5, 10, Bound.EXACT, 100)
+    table.store(2, 3, 20, Bound.LOWER, 200)
+    assert table.probe(1) == Entry(5, 10, Bound.EXACT, 100)
+    assert table.probe(2) == Entry(3, 20, Bound.LOWER, 200)
+    assert table.collisions == 0
+
+    table.store(3, 2, 30, Bound.UPPER, 300)
+    assert table.probe(1) == Entry(5, 10, Bound.EXACT, 100)
+    assert table.probe(2) is None
+    assert table.probe(3) == Entry(2, 30, Bound.UPPER, 300)
+    assert table.collisions == 1
+
+
+def test_deeper_result_moves_the_replaced_result_to_the_always_replace_slot(table):
+    table.store(1, 3, 10, Bound.EXACT, 100)
+    table.store(2, 5, 20, Bound.EXACT, 200)
+
+    assert table.probe(1) == Entry(3, 10, Bound.EXACT, 100)
+    assert table.probe(2) == Entry(5, 20, Bound.EXACT, 200)
+
+
+def test_keeps_the_best_move_without_a_new_one(table):
+    table.store(1, 4, 10, Bound.EXACT, 100)
+    table.store(1, 6, -10, Bound.UPPER, 0)
+    assert table.probe(1) == Entry(6, -10, Bound.UPPER, 100)
+
+    # the same in the always-replace slot
+    table.store(2, 2, 20, Bound.LOWER, 200)
+    table.store(2, 1, 30, Bound.EXACT, 0)
+    assert table.probe(2) == Entry(1, 30, Bound.EXACT, 200)
+
+
+def test_counters(table):
+    assert table.probe(1) is None
+    table.store(1, 1, 0, Bound.EXACT, 1)
+    assert table.probe(1) is not None
+    assert table.probe(1) is not None
+
+    assert (table.hits, table.misses) == (2, 1)
+    assert table.hit_rate == pytest.approx(2 / 3)
+
+    table.store(2, 0, 0, Bound.EXACT, 2)
+    table.store(3, 0, 0, Bound.EXACT, 3)
+    assert table.collisions == 1
+
+    table.clear()
+    assert (table.hits, table.misses, table.collisions) == (0, 0, 0)
+    assert table.probe(1) is None
@@ -0,0 +1,53 @@
+"""
+Bitboard util functions. A bitboard is a 64-bit integer in which bit n represents the n-th square of the board,
+counted in the same order as the flattened board: A8 is square 0, H8 is square 7 and H1 is square 63.
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from typing import Iterator
+from utils.letters import LETTERS
+
+EMPTY = 0
+FULL = (1 << 64) - 1
+
+FILE_A = sum(1 << (8 * r) for r in range(8))
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+
+SQUARE_NAMES = [f'{LETTERS[s % 8]}{8 - s // 8}' for s in range(64)]
+LIGHT_SQUARES = sum(1 << s for s in range(64) if (s // 8 + s % 8) % 2 == 0)
+
+
+def bit(square: int) -> int:
+    """ return the bitboard with only the given square set """
+    return 1 << square
+
+
+def squares(bitboard: int) -> Iterator[int]:
+    """ iterate over the squares set in the bitboard, from low to high """
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
+
+
+def lsb(bitboard: int) -> int:
+    """ return the lowest square set in a non-empty bitboard """
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def msb(bitboard: int) -> int:
+    """ return the highest square set in a non-empty bitboard """
+    return bitboard.bit_length() - 1
+
+
+def neighbors(bitboard: int) -> int:
+    """ return all squares adjacent (orthogonally and diagonally) to any of the squares in the bitboard """
+    west = (bitboard >> 1) & NOT_FILE_H
+    east = (bitboard << 1) & NOT_FILE_A
+    row = bitboard | west | east
+
+    return ((row >> 8) | (row << 8) | west | east) & FULL
+
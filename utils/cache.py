@@ -0,0 +1,29 @@
+"""
+Cache util functions
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from functools import wraps
+from typing import Callable
+
+
+def per_position(method: Callable) -> Callable:
+    """ memoise the result of a method without arguments for the current position of the object it is bound to. The
+    position is identified by the 'key' attribute of the object, all memoised results are dropped once it changes,
+    i.e. when a move is made or taken back """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        key = self.key
+        cache = self.__dict__.get('_position_cache')
+        if cache is None or cache.get(None) != key:
+            cache = self.__dict__['_position_cache'] = {None: key}
+
+        if name not in cache:
+            cache[name] = method(self)
+
+        return cache[name]
+
+    return wrapper
@@ -0,0 +1,58 @@
+"""
+A command line interface to validate a collection of games against the rules engine. Replays every game of a PGN or
+game record file across a pool of processes, reports the games with an illegal move, in order, followed by the final
+states and the throughput. Exits with 1 if any game has an illegal move, and with 2 if the file can't be read.
+
+usage: python -m validate FILE [--workers N] [--chunk-size N] [--verbose]
+
+author: David den Uyl (djdenuyl@gmail.com)
+date: 2026-10-18
+"""
+from argparse import ArgumentParser
+from collections import Counter
+from os import cpu_count
+from src.validation import CHUNK_SIZE, read_games, validate
+from sys import exit, stderr
+from time import perf_counter
+
+
+def main():
+    parser = ArgumentParser(description='replay the games of a PGN or game record file and report the illegal ones')
+    parser.add_argument('file', help='the PGN or game record file')
+    parser.add_argument('--workers', type=int, default=cpu_count() or 1,
+                        help='the number of processes, defaults to the number of cores')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'the number of games handed to a process at a time, defaults to {CHUNK_SIZE}')
+    parser.add_argument('--verbose', action='store_true', help='print the outcome of every game')
+    args = parser.parse_args()
+
+    start = perf_counter()
+    games, illegal, plies = 0, 0, 0
+    states = Counter()
+    try:
+        for result in validate(read_games(args.file), args.workers, args.chunk_size):
+            games += 1
+            plies += result.plies
+            if not result.ok:
+                illegal += 1
+                print(f'BAD game {result.index + 1}: {result.error}')
+                continue
+
+            state = result.state.value if result.state is not None else 'none'
+            states[state] += 1
+            if args.verbose:
+                print(f'ok  game {result.index + 1}: {result.plies} plies, {state}')
+    except (OSError, ValueError) as e:
+        print(f'could not read {args.file}: {e}', file=stderr)
+        exit(2)
+
+    seconds = perf_counter() - start
+    print(f'{games:,} games, {illegal:,} illegal, {plies:,} plies in {seconds:.3f}s '
+          f'({games / seconds if seconds else 0:,.0f} games/s)')
+    print('final states: ' + ', '.join(f'{state} {count:,}' for state, count in states.most_common()))
+
+    exit(1 if illegal else 0)
+
+
+if __name__ == '__main__':
+    main()